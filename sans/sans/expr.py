@@ -2,7 +2,9 @@
 from __future__ import annotations
 from typing import Any, Dict, List
 
-# Expression nodes are JSON-serializable dicts.
+# Expression nodes are JSON-serializable dicts. They are embedded as-is in IR
+# step params, hashed and emitted in plans, and read by type_infer, lowering,
+# the formatter and the runtime, so they stay plain dicts rather than classes.
 ExprNode = Dict[str, Any]
 
 def lit(value: Any) -> ExprNode:
@@ -1,6 +1,7 @@
 from .expr import (
     LegacyExprError,
     find_legacy_tokens,
+    has_legacy_tokens,
     translate_legacy_predicate,
     parse_legacy_predicate,
 )
@@ -8,6 +9,7 @@ from .expr import (
 __all__ = [
     "LegacyExprError",
     "find_legacy_tokens",
+    "has_legacy_tokens",
     "translate_legacy_predicate",
     "parse_legacy_predicate",
 ]
@@ -29,6 +29,7 @@ _LEGACY_WORD_OPS = {
 _WORD_OP_RE = re.compile(r"\b(eq|ne|lt|le|gt|ge)\b", re.IGNORECASE)
 _SINGLE_EQ_RE = re.compile(r"(?<![<>=!^~])=(?![=])")
 _UNSUPPORTED_OP_RE = re.compile(r"<>")
+_NEGATED_EQ_RE = re.compile(r"\^=|~=")
 
 
 def _split_string_segments(text: str) -> List[Tuple[str, bool]]:
@@ -115,12 +116,27 @@ def find_legacy_tokens(text: str) -> List[str]:
         if is_string:
             continue
         tokens.extend(m.group(1).lower() for m in _WORD_OP_RE.finditer(segment))
-        tokens.extend(m.group(0) for m in re.finditer(r"\^=|~=", segment))
+        tokens.extend(m.group(0) for m in _NEGATED_EQ_RE.finditer(segment))
         tokens.extend(m.group(0) for m in _SINGLE_EQ_RE.finditer(segment))
         tokens.extend(m.group(0) for m in _UNSUPPORTED_OP_RE.finditer(segment))
     return tokens
 
 
+def has_legacy_tokens(text: str) -> bool:
+    """Like ``bool(find_legacy_tokens(text))`` but stops at the first hit."""
+    for segment, is_string in _split_string_segments(text):
+        if is_string:
+            continue
+        if (
+            _WORD_OP_RE.search(segment)
+            or _NEGATED_EQ_RE.search(segment)
+            or _SINGLE_EQ_RE.search(segment)
+            or _UNSUPPORTED_OP_RE.search(segment)
+        ):
+            return True
+    return False
+
+
 def translate_legacy_predicate(
     text: str,
     file_name: str = "<string>",
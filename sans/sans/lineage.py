@@ -154,7 +154,8 @@ def _infer_schema_two_pass(
             elif input_schema is None:
                 schema[output_table] = None
             else:
-                schema[output_table] = [col for col in input_schema if col not in drop]
+                drop_set = frozenset(drop)
+                schema[output_table] = [col for col in input_schema if col not in drop_set]
             continue
 
         if step.op == "drop":
@@ -27,6 +27,9 @@ TOKEN_PATTERNS = [
     (r",", "COMMA"),
 ]
 
+# Compiled once; tokenize() tries these in order at every position.
+_COMPILED_TOKEN_PATTERNS = [(re.compile(pattern), token_type) for pattern, token_type in TOKEN_PATTERNS]
+
 class Token:
     def __init__(self, type: str, value: str, loc: Loc):
         self.type = type
@@ -42,8 +45,7 @@ def tokenize(text: str, file_name: str = "<string>") -> Iterator[Token]:
     col_num = 1 # Not strictly needed for Loc, but good for error reporting
     while pos < len(text):
         match = None
-        for pattern, token_type in TOKEN_PATTERNS:
-            regex = re.compile(pattern)
+        for regex, token_type in _COMPILED_TOKEN_PATTERNS:
             m = regex.match(text, pos)
             if m:
                 value = m.group(0)
@@ -50,6 +50,33 @@ def _parse_expr(expr_text: str, file_name: str, legacy_sas: bool) -> dict:
     return parse_expression_from_string(expr_text, file_name)
 
 
+def _split_if_then(stmt_text: str) -> Optional[tuple[str, str]]:
+    """Split `if <pred> then <action>` on the first whitespace-delimited THEN.
+
+    Linear `str.find` scan equivalent to `if\\s+(.+?)\\s+then\\s+(.+)$` (IGNORECASE),
+    without the lazy-quantifier backtracking. Returns None when the form is malformed.
+    """
+    low = stmt_text.lower()
+    n = len(low)
+    pred_start = 2
+    while pred_start < n and low[pred_start].isspace():
+        pred_start += 1
+    search = pred_start + 1  # predicate must be non-empty
+    while True:
+        pos = low.find("then", search)
+        if pos == -1:
+            return None
+        search = pos + 1
+        if not (low[pos - 1].isspace() and pos + 4 < n and low[pos + 4].isspace()):
+            continue
+        pred = stmt_text[pred_start:pos].rstrip()
+        if "\n" in pred:
+            return None
+        action = stmt_text[pos + 4:].lstrip()
+        if pred and action and "\n" not in action:
+            return pred, action
+
+
 def _split_tokens_outside_parens(text: str) -> list[str]:
     tokens: list[str] = []
     buf: list[str] = []
@@ -720,6 +747,10 @@ def recognize_data_block(block: Block, legacy_sas: bool = False) -> list[OpStep
     return steps
 
 
+_DATASTEP_SKIP_PREFIXES = ("set ", "merge ", "by ", "retain ", "keep ")
+_DATASTEP_FORBIDDEN_PREFIXES = ("array", "lag", "infile", "input", "call", "proc", "%")
+
+
 class DataStepParser:
     def __init__(self, statements: List[Statement], file_name: str, legacy_sas: bool):
         self.statements = list(statements)
@@ -747,10 +778,16 @@ class DataStepParser:
             if node: parsed.append(node)
         return parsed
 
-    def parse_next(self) -> Optional[Dict[str, Any]] | UnknownBlockStep:
-        if self.i >= len(self.statements): return None
-        stmt = self.consume(); s = stmt.text.strip(); s_low = s.lower()
-        if any(s_low.startswith(k) for k in ["set ", "merge ", "by ", "retain ", "keep "]) or s_low == "run": return None
+    def parse_next(self, head: Optional[Statement] = None) -> Optional[Dict[str, Any]] | UnknownBlockStep:
+        # `head` parses a synthesized statement (ELSE IF / THEN DO ... TO) in
+        # place, continuing on self.statements without copying the remainder.
+        if head is None:
+            if self.i >= len(self.statements): return None
+            stmt = self.consume()
+        else:
+            stmt = head
+        s = stmt.text.strip(); s_low = s.lower()
+        if s_low.startswith(_DATASTEP_SKIP_PREFIXES) or s_low == "run": return None
 
         if s_low.startswith("do"):
             if re.match(r"do\s+(while|until)\b", s_low):
@@ -800,29 +837,25 @@ class DataStepParser:
 
         if s_low.startswith("if "):
             if " then " in s_low:
-                m = re.match(r"if\s+(.+?)\s+then\s+(.+)$", s, re.I)
-                if not m: return UnknownBlockStep(code="SANS_PARSE_UNSUPPORTED_DATASTEP_FORM", message="Malformed IF", loc=stmt.loc)
+                split = _split_if_then(s)
+                if not split: return UnknownBlockStep(code="SANS_PARSE_UNSUPPORTED_DATASTEP_FORM", message="Malformed IF", loc=stmt.loc)
+                pred_text, then_text = split
                 try:
-                    pred_ast = _parse_expr(m.group(1), self.file_name, self.legacy_sas)
+                    pred_ast = _parse_expr(pred_text, self.file_name, self.legacy_sas)
                 except LegacyExprError as e:
                     return UnknownBlockStep(code=e.code, message=e.message, loc=stmt.loc)
                 except Exception as e:
                     return UnknownBlockStep(code="SANS_PARSE_EXPRESSION_ERROR", message=str(e), loc=stmt.loc)
-                then_action = self.parse_action_or_do(m.group(2).strip(), stmt.loc)
+                then_action = self.parse_action_or_do(then_text, stmt.loc)
                 if isinstance(then_action, UnknownBlockStep): return then_action
                 node = {"type": "if_then", "predicate": pred_ast, "then": then_action, "else": None}
                 while self.peek() and self.peek().startswith("else"):
                     else_stmt = self.consume(); else_s = else_stmt.text.strip()
                     if else_s.lower().startswith("else if "):
                         if_part = else_s[len("else "):].strip()
-                        inner_parser = DataStepParser(
-                            [Statement(if_part, else_stmt.loc)] + self.statements[self.i:],
-                            self.file_name,
-                            self.legacy_sas,
-                        )
-                        inner_node = inner_parser.parse_next()
+                        inner_node = self.parse_next(Statement(if_part, else_stmt.loc))
                         if isinstance(inner_node, UnknownBlockStep): return inner_node
-                        node["else"] = inner_node; self.i += (inner_parser.i - 1); break
+                        node["else"] = inner_node; break
                     else:
                         else_action = self.parse_action_or_do(else_s[len("else "):].strip(), else_stmt.loc)
                         if isinstance(else_action, UnknownBlockStep): return else_action
@@ -877,12 +910,7 @@ class DataStepParser:
             return {"type": "assign", "target": m.group(1).lower(), "expr": e_ast}
         
         # Forbidden tokens check
-        def find_forbidden(text):
-            low = text.lower()
-            if any(low.startswith(k) for k in ["array", "lag", "infile", "input", "call", "proc"]): return True
-            if low.startswith("%"): return True
-            return False
-        if find_forbidden(s):
+        if s_low.startswith(_DATASTEP_FORBIDDEN_PREFIXES):
             return UnknownBlockStep(code="SANS_BLOCK_STATEFUL_TOKEN", message=f"Forbidden token in: {s}", loc=stmt.loc)
 
         return UnknownBlockStep(code="SANS_PARSE_UNSUPPORTED_DATASTEP_FORM", message=f"Unsupported statement: '{s}'", loc=stmt.loc)
@@ -891,14 +919,7 @@ class DataStepParser:
         a_l = action_str.lower()
         if a_l.startswith("do"):
             if " to " in a_l:
-                sub = DataStepParser(
-                    [Statement(action_str, loc)] + self.statements[self.i:],
-                    self.file_name,
-                    self.legacy_sas,
-                )
-                res = sub.parse_next()
-                if isinstance(res, UnknownBlockStep): return res
-                self.i += (sub.i - 1); return res
+                return self.parse_next(Statement(action_str, loc))
             else:
                 body = self.parse_body(until_end=True)
                 if isinstance(body, UnknownBlockStep): return body
@@ -439,9 +439,10 @@ def _apply_dataset_options(
             kept_rows.append({k: row.get(k) for k in keep_cols})
         output_rows = kept_rows
     elif drop_cols:
+        drop_set = frozenset(drop_cols)
         dropped_rows: List[Dict[str, Any]] = []
         for row in output_rows:
-            dropped_rows.append({k: v for k, v in row.items() if k not in drop_cols})
+            dropped_rows.append({k: v for k, v in row.items() if k not in drop_set})
         output_rows = dropped_rows
 
     rename_map = options.get("rename") or {}
@@ -1765,17 +1766,17 @@ def execute_plan(
                             output_rows.append(dict(row))
                 elif op == "select":
                     cols = step.params.get("cols") or []
-                    drop = step.params.get("drop") or []
+                    drop_set = frozenset(step.params.get("drop") or [])
                     output_rows = []
                     for row in input_rows:
                         if cols:
                             new_row = {k: row.get(k) for k in cols}
                         else:
-                            new_row = {k: v for k, v in row.items() if k not in drop}
+                            new_row = {k: v for k, v in row.items() if k not in drop_set}
                         output_rows.append(new_row)
                 elif op == "drop":
                     cols = step.params.get("cols") or []
-                    drop_set = set(cols)
+                    drop_set = frozenset(cols)
                     output_rows = []
                     for row in input_rows:
                         new_row = {k: v for k, v in row.items() if k not in drop_set}
@@ -2136,7 +2137,7 @@ def generate_schema_lock_standalone(
                     None,
                 )
         from .schema_infer import DEFAULT_INFER_MAX_ROWS
-        from .schema_lock import build_schema_lock, compute_lock_sha256, write_schema_lock
+        from .schema_lock import build_schema_lock, write_schema_lock
         csv_path_overrides: Dict[str, Path] = {}
         for ds_name in referenced:
             ds = irdoc.datasources.get(ds_name) if irdoc.datasources else None
@@ -2156,8 +2157,7 @@ def generate_schema_lock_standalone(
             csv_path_overrides=csv_path_overrides or None,
         )
         write_path_resolved = Path(write_path).resolve()
-        write_schema_lock(lock_dict, write_path_resolved)
-        report["schema_lock_sha256"] = compute_lock_sha256(lock_dict)
+        report["schema_lock_sha256"] = write_schema_lock(lock_dict, write_path_resolved)
         report["schema_lock_mode"] = "generated_only"
         report["lock_only"] = True
         report["schema_lock_emit_path"] = str(write_path_resolved)
@@ -2480,7 +2480,7 @@ def run_script(
         if emit_schema_lock_path and (untyped or lock_only):
             import shutil
             from .schema_infer import DEFAULT_INFER_MAX_ROWS
-            from .schema_lock import build_schema_lock, compute_lock_sha256, write_schema_lock
+            from .schema_lock import build_schema_lock, write_schema_lock
             script_dir = Path(file_name).resolve().parent
             for ds_name in untyped:
                 ds = irdoc.datasources.get(ds_name) if irdoc.datasources else None
@@ -2503,8 +2503,7 @@ def run_script(
                 infer_untyped=bool(untyped),
                 max_infer_rows=DEFAULT_INFER_MAX_ROWS,
             )
-            write_schema_lock(lock_dict, resolved_emit_lock_path)
-            report["schema_lock_sha256"] = compute_lock_sha256(lock_dict)
+            report["schema_lock_sha256"] = write_schema_lock(lock_dict, resolved_emit_lock_path)
             report["schema_lock_mode"] = "generated_only"
             report["lock_only"] = True
             report["schema_lock_emit_path"] = str(resolved_emit_lock_path)
@@ -2913,11 +2912,10 @@ def run_script(
     })
 
     if resolved_emit_lock_path is not None and result.status in ("ok", "ok_warnings"):
-        from .schema_lock import build_schema_lock, write_schema_lock, compute_lock_sha256
+        from .schema_lock import build_schema_lock, write_schema_lock
         referenced = _referenced_csv_datasource_names(irdoc)
         lock_dict = build_schema_lock(irdoc, referenced, schema_lock_used=schema_lock, sans_version=_engine_version)
-        write_schema_lock(lock_dict, resolved_emit_lock_path)
-        report["schema_lock_sha256"] = compute_lock_sha256(lock_dict)
+        report["schema_lock_sha256"] = write_schema_lock(lock_dict, resolved_emit_lock_path)
         report["schema_lock_mode"] = "ran_and_emitted"
         report["lock_only"] = False
         report["schema_lock_emit_path"] = str(resolved_emit_lock_path)
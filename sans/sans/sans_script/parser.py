@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Optional, Union
+import string
+import sys
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-from sans.expr import ExprNode
+from sans.expr import ExprNode, col, lit
 from sans.parser_expr import parse_expression_from_string
-from sans.legacy import find_legacy_tokens
+from sans.legacy import has_legacy_tokens
 from sans.types import Type, parse_type_name
 
 from .ast import (
@@ -34,6 +38,64 @@ from .errors import SansScriptError
 IDENT_RE = r"[A-Za-z_][A-Za-z0-9_]*"
 
 _DECIMAL_RE = re.compile(r"^[+-]?(?:\d+\.\d*|\d*\.\d+|\d+)$")
+_TRIVIAL_IDENT_RE = re.compile(IDENT_RE)
+_CONST_DECIMAL_RE = re.compile(r"^[+-]?\d+\.\d*$|^[+-]?\d*\.\d+$")
+# Words the expression tokenizer/legacy check treat specially; never fast-pathed as columns.
+_RESERVED_EXPR_WORDS = frozenset({
+    "and", "or", "not", "coalesce", "if", "put", "input", "null",
+    "eq", "ne", "lt", "le", "gt", "ge",
+})
+
+# Statement / clause patterns, compiled once at import. Keywords are written in
+# lower case and matched against an ASCII-lowered view of the text, so no pattern
+# needs re.IGNORECASE; groups that must keep their case are sliced from the
+# original text by span.
+_DATASOURCE_RE = re.compile(rf"^datasource\s+({IDENT_RE})\s*=\s*(.*)$")
+_CSV_RE = re.compile(r'^csv\s*\(\s*"([^"]*)"\s*(?:,\s*columns\s*\(([^)]*)\)\s*)?\)$')
+_COLUMNS_CLAUSE_RE = re.compile(r"^columns\s*\(([^)]*)\)\s*$")
+_INLINE_CSV_DO_RE = re.compile(r"^inline_csv(?:\s+columns\s*\(([^)]*)\))?\s+do\s*$")
+_LET_RE = re.compile(rf"let\s+({IDENT_RE})\s*=\s*(.+)")
+_TABLE_BIND_RE = re.compile(rf"table\s+({IDENT_RE})\s*=\s*(.*)")
+_SAVE_RE = re.compile(
+    rf"save\s+({IDENT_RE})\s+to\s+\"([^\"]*)\"(?:\s+as\s+\"([^\"]*)\")?\s*$"
+)
+_NAME_REST_RE = re.compile(rf"({IDENT_RE})(.*)")
+_BRACKET_SELECT_RE = re.compile(r"\[([^\]]+)\](.*)")
+_POSTFIX_KW_RE = re.compile(r"(select|filter|derive|rename|drop|update!|cast)(?:\s+|\()")
+_NEXT_POSTFIX_KW_RE = re.compile(r"\s+(select|filter|derive|rename|drop|update!|cast)(?:\s+|\()")
+_ASSIGN_RE = re.compile(rf"({IDENT_RE})\s*=\s*(.+)")
+_CAST_ON_ERROR_RE = re.compile(r"on_error\s*=\s*(\w+)")
+_CAST_TRIM_RE = re.compile(r"trim\s*=\s*(\w+)")
+# Column lists split on commas and whitespace: map commas to spaces, then str.split().
+_COMMA_TO_SPACE = str.maketrans(",", " ")
+_COMMA_OR_PAREN_RE = re.compile(r"[(),]")
+
+# Table transform keywords and the line prefixes that start a postfix clause
+# (`kw `, `kw(`, or `[` bracket-select sugar), for one tuple-form startswith.
+_TRANSFORM_KWS = frozenset({"select", "filter", "derive", "rename", "drop", "update!", "cast"})
+_POSTFIX_LINE_PREFIXES = ("[",) + tuple(
+    kw + follow for kw in sorted(_TRANSFORM_KWS) for follow in (" ", "(")
+)
+# Matches a pipeline step keyword on an already-lowered line: `kw `, `kw(` or bare `kw`.
+_STEP_KW_RE = re.compile(r"(select|filter|derive|rename|drop|update!|cast)(?= |\(|$)")
+_IMPLICIT_BUILDER_PREFIXES = ("sort()", "summary()", "aggregate()")
+_BUILDER_FORMS = frozenset({"sort", "aggregate", "summary"})
+_AGG_KINDS = frozenset({"summary", "aggregate"})
+_QUOTE_CHARS = frozenset("'\"")
+_TRUTHY_FLAGS = frozenset({"true", "1", "yes"})
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _ascii_lower(text: str) -> str:
+    """Lower-case ASCII letters only, so offsets line up with ``text``."""
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+
+
+def _span_text(m: re.Match[str], text: str, group: int) -> Optional[str]:
+    start, end = m.span(group)
+    return text[start:end] if start != -1 else None
+
 
 def normalize_decimal_string(s: str) -> str:
     """Canonicalize decimal literal string for IR storage. Deterministic; no exponent."""
@@ -160,12 +222,25 @@ def _split_inline_comment(line: str) -> tuple[str, str | None]:
     return line, None
 
 
+@lru_cache(maxsize=4096)
+def _has_legacy_tokens(text: str) -> bool:
+    return has_legacy_tokens(text)
+
+
 class _Line:
-    def __init__(self, text: str, number: int) -> None:
+    # One instance per source line; slots drop the per-instance __dict__.
+    __slots__ = ("text", "number", "code", "comment", "stripped", "lowered")
+
+    def __init__(self, text: str, number: int, lowered_text: str | None = None) -> None:
         self.text = text
         self.number = number
         self.code, self.comment = _split_inline_comment(text)
         self.stripped = self.code.strip()
+        if lowered_text is None:
+            self.lowered = _ascii_lower(self.stripped)
+        else:
+            # ASCII lowering preserves offsets, so the code span lines up.
+            self.lowered = lowered_text[: len(self.code)].strip()
 
     @property
     def raw(self) -> str:
@@ -174,10 +249,8 @@ class _Line:
 import re
 import hashlib
 
-def _sha256_text(s: str) -> str:
-    return hashlib.sha256(s.encode("utf-8")).hexdigest()
-
-def _normalize_inline_csv(lines: list[str]) -> str:
+def _normalize_inline_csv(lines: list[str]) -> tuple[str, str]:
+    """Return (normalized_text, sha256_hex) for an inline_csv body."""
     # deterministic normalization: strip trailing whitespace, normalize newlines
     cleaned = [ln.rstrip() for ln in lines]
     # drop leading/trailing completely blank lines inside the block
@@ -185,43 +258,60 @@ def _normalize_inline_csv(lines: list[str]) -> str:
         cleaned.pop(0)
     while cleaned and cleaned[-1].strip() == "":
         cleaned.pop()
-    return "\n".join(cleaned) + ("\n" if cleaned else "")
+    # One join and one encode of the whole body; for ASCII the encode is a copy,
+    # which beats encoding and hashing line by line.
+    text = "\n".join(cleaned) + ("\n" if cleaned else "")
+    return text, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _is_skippable(raw: str) -> bool:
+    """True when the line has no code: blank, or a comment from its first character."""
+    head = raw.lstrip()
+    return not head or head[0] == "#"
+
 
 class SansScriptParser:
     HEADER_MARKER = "# sans "
     HEADER_VERSION = "0.1"
 
     def __init__(self, text: str) -> None:
-        self._lines = [
-            _Line(line.rstrip("\r"), idx + 1)
-            for idx, line in enumerate(text.splitlines())
-        ]
+        self._raw_lines = text.splitlines()
+        # One lowercase pass over the whole source instead of one per line.
+        self._lowered_lines: Optional[List[str]] = text.lower().splitlines() if text.isascii() else None
+        # _Line objects are built on first access (see _get_line).
+        self._lines: List[Optional[_Line]] = [None] * len(self._raw_lines)
         self._idx = 0
+        # (start idx, next content idx) from the last lookahead; see _find_content_idx.
+        self._peeked: Optional[tuple[int, int]] = None
+        self._transform_dispatch = {
+            "select": self._tf_select,
+            "drop": self._tf_drop,
+            "filter": self._tf_filter,
+            "derive": self._tf_derive,
+            "update!": self._tf_update,
+            "rename": self._tf_rename,
+            "cast": self._tf_cast,
+        }
         self._file_name: str | None = None
+        # Parsed RHS expressions by stripped text. Scripts repeat small
+        # expressions a lot; identical text within this script shares one node,
+        # which is never mutated downstream. Failures are not cached.
+        self._expr_cache: Dict[str, ExprNode] = {}
 
     def parse(self, file_name: str) -> SansScript:
         self._file_name = file_name
-        # 1. Validate header
-        header_line = None
-        non_empty_seen = 0
-
-        for line in self._lines:
-            raw = line.text.strip()
-            if not raw:
-                continue
-
-            non_empty_seen += 1
-
+        # 1. Validate header (on raw text; no _Line needed)
+        header_number = None
+        non_empty = (
+            (idx, raw) for idx, raw in enumerate(map(str.strip, self._raw_lines)) if raw
+        )
+        for idx, raw in islice(non_empty, 5):
             if raw.startswith(self.HEADER_MARKER):
                 version_part = raw[len(self.HEADER_MARKER):].strip()
                 if version_part == self.HEADER_VERSION:
-                    header_line = line
+                    header_number = idx + 1
                     break
 
-            if non_empty_seen >= 5:
-                break
-
-        if not header_line:
+        if header_number is None:
             raise SansScriptError(
                 code="E_MISSING_HEADER",
                 message=f"Missing '{self.HEADER_MARKER}{self.HEADER_VERSION}' comment header within the first 5 non-empty lines.",
@@ -230,7 +320,7 @@ class SansScriptParser:
             )
 
         # Establish script span start/end
-        span_start = header_line.number
+        span_start = header_number
         span_end = span_start
 
         self._idx = 0
@@ -243,11 +333,12 @@ class SansScriptParser:
                 break
             
             # Check if it's a binding or a terminal expression
-            if line.stripped.lower().startswith("let "):
+            lowered = line.lowered
+            if lowered.startswith("let "):
                 stmt = self._parse_let_binding(line)
                 statements.append(stmt)
                 span_end = max(span_end, stmt.span.end)
-            elif line.stripped.lower().startswith("datasource "):
+            elif lowered.startswith("datasource "):
                 ds = self._parse_datasource_declaration(line)
                 # enforce unique names here (good error)
                 if ds.name in datasources:
@@ -259,19 +350,19 @@ class SansScriptParser:
                 datasources[ds.name] = ds
                 statements.append(ds)  # optional; keep if your AST treats it as a stmt
                 span_end = max(span_end, ds.span.end)
-            elif line.stripped.lower().startswith("table "):
+            elif lowered.startswith("table "):
                 stmt = self._parse_table_binding(line)
                 statements.append(stmt)
                 span_end = max(span_end, stmt.span.end)
-            elif line.stripped.lower().startswith("save "):
+            elif lowered.startswith("save "):
                 stmt = self._parse_save_stmt(line)
                 statements.append(stmt)
                 span_end = max(span_end, stmt.span.end)
-            elif line.stripped.lower().startswith("assert "):
+            elif lowered.startswith("assert "):
                 stmt = self._parse_assert_stmt(line)
                 statements.append(stmt)
                 span_end = max(span_end, stmt.span.end)
-            elif line.stripped.lower().startswith("const "):
+            elif lowered.startswith("const "):
                 stmt = self._parse_const_decl(line)
                 statements.append(stmt)
                 span_end = max(span_end, stmt.span.end)
@@ -300,7 +391,8 @@ class SansScriptParser:
         s = line.stripped
 
         # 1) parse leading: datasource <name> = <rest>
-        m = re.match(rf"^datasource\s+({IDENT_RE})\s*=\s*(.*)$", s, re.IGNORECASE)
+        # Every datasource declaration has an '='; skip the regex when it cannot match.
+        m = _DATASOURCE_RE.match(line.lowered) if "=" in s else None
         if not m:
             raise SansScriptError(
                 code="E_PARSE",
@@ -309,8 +401,8 @@ class SansScriptParser:
                 hint='Use: datasource name = csv("path/to/file.csv"[, columns(a, b)])  OR  datasource name = inline_csv do ... end',
             )
 
-        name = m.group(1).lower()
-        rhs = m.group(2).strip()
+        name = m.group(1)
+        rhs = _span_text(m, s, 2).strip()
         rhs_line = line
         if not rhs:
             next_line = self._next_content_line()
@@ -327,14 +419,11 @@ class SansScriptParser:
         # ------------------------------------------------------------------
         # csv("path"[, columns(...)])
         # ------------------------------------------------------------------
-        m_csv = re.match(
-            r'^csv\s*\(\s*"([^"]*)"\s*(?:,\s*columns\s*\(([^)]*)\)\s*)?\)$',
-            rhs,
-            re.IGNORECASE,
-        )
+        rhs_lowered = _ascii_lower(rhs)
+        m_csv = _CSV_RE.match(rhs_lowered)
         if m_csv:
-            path = m_csv.group(1)
-            columns_str = m_csv.group(2)
+            path = _span_text(m_csv, rhs, 1)
+            columns_str = _span_text(m_csv, rhs, 2)
             columns = None
             column_types = None
             if columns_str:
@@ -412,14 +501,14 @@ class SansScriptParser:
                         line=line.number,
                     )
                 rest = rest[1:].strip()
-                m_cols = re.match(r"^columns\s*\(([^)]*)\)\s*$", rest, re.IGNORECASE)
+                m_cols = _COLUMNS_CLAUSE_RE.match(_ascii_lower(rest))
                 if not m_cols:
                     raise SansScriptError(
                         code="E_PARSE",
                         message="Malformed inline_csv() columns specification.",
                         line=line.number,
                     )
-                columns_str = m_cols.group(1)
+                columns_str = _span_text(m_cols, rest, 1)
                 columns = None
                 column_types = None
                 if columns_str:
@@ -444,8 +533,7 @@ class SansScriptParser:
                     line=line.number,
                 )
 
-            normalized = _normalize_inline_csv(inline_text.splitlines())
-            sha = _sha256_text(normalized)
+            normalized, sha = _normalize_inline_csv(inline_text.splitlines())
 
             return DatasourceDeclaration(
                 name=name,
@@ -473,13 +561,9 @@ class SansScriptParser:
         #     1,2
         #   end
         # ------------------------------------------------------------------
-        m_inline = re.match(
-            r"^inline_csv(?:\s+columns\s*\(([^)]*)\))?\s+do\s*$",
-            rhs,
-            re.IGNORECASE,
-        )
+        m_inline = _INLINE_CSV_DO_RE.match(rhs_lowered)
         if m_inline:
-            columns_str = m_inline.group(1)
+            columns_str = _span_text(m_inline, rhs, 1)
             columns = None
             column_types = None
             if columns_str:
@@ -497,13 +581,12 @@ class SansScriptParser:
                         message="Unterminated inline_csv block: expected 'end'.",
                         line=start_line,
                     )
-                if next_line.stripped.lower() == "end":
+                if next_line.lowered == "end":
                     end_line = next_line.number
                     break
                 body_lines.append(next_line.raw)  # or next_line.text; whichever preserves original (minus \r)
 
-            normalized = _normalize_inline_csv(body_lines)
-            sha = _sha256_text(normalized)
+            normalized, sha = _normalize_inline_csv(body_lines)
 
             return DatasourceDeclaration(
                 name=name,
@@ -529,7 +612,7 @@ class SansScriptParser:
 
     def _parse_let_binding(self, line: _Line) -> LetBinding:
         # let name = <scalar-expr> (single scalar only; for multiple literals use const { })
-        match = re.match(rf"let\s+({IDENT_RE})\s*=\s*(.+)", line.stripped, re.IGNORECASE)
+        match = _LET_RE.match(line.lowered) if "=" in line.stripped else None
         if not match:
             raise SansScriptError(
                 code="E_PARSE",
@@ -537,8 +620,8 @@ class SansScriptParser:
                 line=line.number,
                 hint="Use: let name = expression",
             )
-        name = match.group(1).lower()
-        rhs = match.group(2).strip()
+        name = match.group(1)
+        rhs = _span_text(match, line.stripped, 2).strip()
         if rhs.lower().startswith("map("):
             raise SansScriptError(
                 code="E_PARSE",
@@ -551,7 +634,7 @@ class SansScriptParser:
     def _parse_const_decl(self, line: _Line) -> ConstDecl:
         # const { name = literal, ... } — literals only: int, str, bool, null
         s = line.stripped
-        if not s.lower().startswith("const "):
+        if not line.lowered.startswith("const "):
             raise SansScriptError(code="E_PARSE", message="Malformed const declaration.", line=line.number)
         rest = s[6:].strip()
         if not rest.startswith("{"):
@@ -604,7 +687,7 @@ class SansScriptParser:
                     )
                 name_part, _, value_part = part.partition("=")
                 name = name_part.strip().lower()
-                if not re.match(rf"{IDENT_RE}", name):
+                if not _TRIVIAL_IDENT_RE.match(name):
                     raise SansScriptError(code="E_PARSE", message=f"Invalid const name: '{name}'", line=line.number)
                 value_part = value_part.strip()
                 literal = self._parse_const_literal(value_part, line.number)
@@ -622,7 +705,7 @@ class SansScriptParser:
             return True
         if text.lower() == "false":
             return False
-        if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"'):
+        if len(text) >= 2 and text[0] == text[-1] and text[0] in _QUOTE_CHARS:
             return text[1:-1]
         try:
             return int(text)
@@ -635,7 +718,7 @@ class SansScriptParser:
                 message="const decimal literals do not support exponent notation (e.g. 1e-3).",
                 line=line_no,
             )
-        if re.match(r"^[+-]?\d+\.\d*$|^[+-]?\d*\.\d+$", text):
+        if _CONST_DECIMAL_RE.match(text):
             return {"type": "decimal", "value": normalize_decimal_string(text)}
         raise SansScriptError(
             code="E_PARSE",
@@ -646,7 +729,7 @@ class SansScriptParser:
 
     def _parse_table_binding(self, line: _Line) -> TableBinding:
         # table name = <table-expr>
-        match = re.match(rf"table\s+({IDENT_RE})\s*=\s*(.*)", line.stripped, re.IGNORECASE)
+        match = _TABLE_BIND_RE.match(line.lowered) if "=" in line.stripped else None
         if not match:
             raise SansScriptError(
                 code="E_PARSE",
@@ -654,8 +737,8 @@ class SansScriptParser:
                 line=line.number,
                 hint="Use: table name = table_expression",
             )
-        name = match.group(1).lower()
-        rhs_start = match.group(2).strip()
+        name = match.group(1)
+        rhs_start = _span_text(match, line.stripped, 2).strip()
         rhs_line = line
         if not rhs_start:
             rhs_line = self._next_content_line()
@@ -675,11 +758,7 @@ class SansScriptParser:
     def _parse_save_stmt(self, line: _Line) -> SaveStmt:
         # save <table> to "<path>" [as "<name>"]
         s = line.stripped
-        m = re.match(
-            rf"save\s+({IDENT_RE})\s+to\s+\"([^\"]*)\"(?:\s+as\s+\"([^\"]*)\")?\s*$",
-            s,
-            re.IGNORECASE,
-        )
+        m = _SAVE_RE.match(line.lowered)
         if not m:
             raise SansScriptError(
                 code="E_PARSE",
@@ -687,15 +766,15 @@ class SansScriptParser:
                 line=line.number,
                 hint='Use: save table_name to "path" [as "name"]',
             )
-        table = m.group(1).lower()
-        path = m.group(2)
-        name = m.group(3) if m.group(3) else None
+        table = m.group(1)
+        path = _span_text(m, s, 2)
+        name = _span_text(m, s, 3) or None
         return SaveStmt(table=table, path=path, span=SourceSpan(line.number, line.number), name=name)
 
     def _parse_assert_stmt(self, line: _Line) -> AssertStmt:
         # assert <predicate>
         s = line.stripped
-        if not s.lower().startswith("assert "):
+        if not line.lowered.startswith("assert "):
             raise SansScriptError(code="E_PARSE", message="Malformed assert statement.", line=line.number)
         predicate_str = s[7:].strip()
         if not predicate_str:
@@ -714,7 +793,11 @@ class SansScriptParser:
         remainder: str = ""
         end_line = line.number
 
-        if text.lower().startswith("from("):
+        # One partition on '(' picks the source form instead of a startswith per form.
+        head, paren, _ = text.partition("(")
+        form = head.lower() if paren else ""
+
+        if form == "from":
             # from(datasource_name)
             inner, remainder = self._extract_balanced_parens(text[4:], line.number)
             source = inner.strip().lower()
@@ -725,23 +808,16 @@ class SansScriptParser:
                 steps = self._parse_pipeline_steps(body)
                 primary = PipelineExpr(source=primary, steps=steps, span=SourceSpan(line.number, end_line))
                 remainder = ""
-        elif text.lower().startswith("sort("):
-            inner, remainder = self._extract_balanced_parens(text[4:], line.number)
+        elif form in _BUILDER_FORMS:
+            # sort(...), aggregate(...), and summary(...) (legacy input sugar; parses
+            # same as aggregate, lowerer emits op "aggregate").
+            inner, remainder = self._extract_balanced_parens(text[len(form):], line.number)
             # Recursively parse inner as table expr
             source = self._parse_table_expr(line, rhs_override=inner)
-            primary, remainder, end_line = self._parse_builder("sort", source, remainder, line)
-        elif text.lower().startswith("aggregate("):
-            inner, remainder = self._extract_balanced_parens(text[9:], line.number)
-            source = self._parse_table_expr(line, rhs_override=inner)
-            primary, remainder, end_line = self._parse_builder("aggregate", source, remainder, line)
-        elif text.lower().startswith("summary("):
-            # Legacy input sugar; parses same as aggregate, lowerer emits op "aggregate".
-            inner, remainder = self._extract_balanced_parens(text[7:], line.number)
-            source = self._parse_table_expr(line, rhs_override=inner)
-            primary, remainder, end_line = self._parse_builder("summary", source, remainder, line)
+            primary, remainder, end_line = self._parse_builder(form, source, remainder, line)
         else:
             # Table name
-            name_match = re.match(rf"({IDENT_RE})(.*)", text)
+            name_match = _NAME_REST_RE.match(text)
             if not name_match:
                 raise SansScriptError(
                     code="E_PARSE",
@@ -760,140 +836,100 @@ class SansScriptParser:
         if not text.startswith("("):
              raise SansScriptError(code="E_PARSE", message="Expected '(", line=line_no)
         
+        # Jump between parenthesis characters with str.find.
         depth = 0
-        for i, char in enumerate(text):
-            if char == "(":
+        i = 0
+        while True:
+            close = text.find(")", i)
+            if close == -1:
+                break
+            open_ = text.find("(", i, close)
+            if open_ != -1:
                 depth += 1
-            elif char == ")":
-                depth -= 1
-                if depth == 0:
-                    return text[1:i], text[i+1:].strip()
-        
+                i = open_ + 1
+                continue
+            depth -= 1
+            if depth == 0:
+                return text[1:close], text[close + 1:].strip()
+            i = close + 1
+
         raise SansScriptError(code="E_PARSE", message="Unbalanced parentheses", line=line_no)
 
     def _parse_pipeline_steps(self, body: List[_Line]) -> List[TableTransform]:
-        steps: List[TableTransform] = []
+        return [
+            self._parse_transform_clause(kw, args, line_no)
+            for kw, args, line_no in self._iter_pipeline_steps(body)
+        ]
+
+    def _iter_pipeline_steps(self, body: List[_Line]) -> Iterator[tuple[str, str, int]]:
+        """Yield (keyword, args, line_no) per step in one forward pass over body."""
         idx = 0
-        while idx < len(body):
+        n = len(body)
+        while idx < n:
             line = body[idx]
-            content = line.stripped.rstrip(";")
             idx += 1
-            if not content: continue
-            
-            lowered = content.lower()
-            
-            # Identify keyword and initial args
-            kw = None
-            kw_len = 0
-            
-            processed_content = content
-            processed_lowered = lowered
+            content = line.stripped.rstrip(";")
+            if not content:
+                continue
 
-            for k in ["select", "filter", "derive", "rename", "drop", "update!", "cast"]:
-                if processed_lowered.startswith(k + " ") or processed_lowered.startswith(k + "(") or processed_lowered.strip() == k:
-                    kw = k
-                    kw_len = len(k)
-                    break
-            
-            if kw:
-                args = processed_content[kw_len:].strip()
-                
-                # Check for 'do' block
-                if args.lower() == "do" or args.lower().endswith(" do"):
-                     block_lines = []
-                     temp_idx = idx
-                     depth = 0
-                     found_end = False
-                     
-                     while temp_idx < len(body):
-                         l = body[temp_idx]
-                         cleaned = l.stripped.rstrip(";").lower()
-                         if cleaned == "end":
-                             if depth == 0:
-                                 found_end = True
-                                 temp_idx += 1
-                                 break
-                             depth -= 1
-                         elif cleaned.endswith(" do"):
-                             depth += 1
-                         
-                         block_lines.append(l.stripped.rstrip(";"))
-                         temp_idx += 1
-                     
-                     if not found_end:
-                         raise SansScriptError(code="E_PARSE", message="Missing 'end' for nested block.", line=line.number)
-                     
-                     idx = temp_idx
-                     block_content = ", ".join(block_lines)
-                     
-                     if args.lower() == "do":
-                         args = block_content
-                     else:
-                         prefix = args[:-2].strip()
-                         args = (prefix + ", " + block_content) if prefix else block_content
-
-                # Multiline parens logic for args
-                elif args.startswith("(") and not args.endswith(")"):
-                    # This implies the multiline parsing should be handled here, 
-                    # consuming multiple 'line' objects from 'body'
-                    
-                    # Store current idx to restore if no match, or consume lines
-                    current_idx_in_body = idx - 1 # Current 'line' is body[idx-1]
-                    matched_parens = False
-                    
-                    full_args_lines = []
-                    temp_idx = current_idx_in_body
-                    temp_depth = 0
-                    
-                    # Find the opening paren in the 'args' part of the current line
-                    paren_start_pos = args.find("(")
-                    if paren_start_pos != -1:
-                        temp_depth += 1
-                        full_args_lines.append(args[paren_start_pos:])
-                        
-                        while temp_idx < len(body):
-                            if temp_idx > current_idx_in_body: # Only process subsequent lines
-                                stripped = body[temp_idx].stripped.rstrip(";")
-                                full_args_lines.append(stripped)
-                            else:
-                                stripped = args[paren_start_pos + 1:]
-                                
-                            for char in stripped:
-                                if char == "(": temp_depth += 1
-                                elif char == ")": temp_depth -= 1
-                            
-                            if temp_depth == 0:
-                                matched_parens = True
-                                # Consume lines up to here
-                                idx = temp_idx + 1 
+            lowered = line.lowered.rstrip(";")
+            kw_match = _STEP_KW_RE.match(lowered)
+            if kw_match:
+                kw = kw_match.group(1)
+                args = content[kw_match.end():].strip()
+                args_lowered = args.lower()
+
+                if args_lowered == "do" or args_lowered.endswith(" do"):
+                    # Nested do ... end: collect until the matching end.
+                    block_lines = []
+                    do_depth = 0
+                    while idx < n:
+                        l = body[idx]
+                        idx += 1
+                        cleaned = l.lowered.rstrip(";")
+                        if cleaned == "end":
+                            if do_depth == 0:
                                 break
-                            temp_idx += 1
-                    
-                    if matched_parens:
-                        all_text = " ".join(full_args_lines)
-                        # The args should be the content INSIDE the outermost balanced parens
-                        start_paren = all_text.find("(")
-                        end_paren = all_text.rfind(")")
-                        if start_paren != -1 and end_paren != -1:
-                            args = all_text[start_paren:end_paren+1]
-                        else:
-                            raise SansScriptError(code="E_PARSE", message="Malformed multiline parenthesized arguments.", line=line.number)
+                            do_depth -= 1
+                        elif cleaned.endswith(" do"):
+                            do_depth += 1
+                        block_lines.append(l.stripped.rstrip(";"))
                     else:
+                        raise SansScriptError(code="E_PARSE", message="Missing 'end' for nested block.", line=line.number)
+
+                    block_content = ", ".join(block_lines)
+                    if args_lowered == "do":
+                        args = block_content
+                    else:
+                        prefix = args[:-2].strip()
+                        args = f"{prefix}, {block_content}" if prefix else block_content
+
+                elif args.startswith("(") and not args.endswith(")"):
+                    # Multiline parenthesized args: consume lines until parens balance.
+                    full_args_lines = [args]
+                    paren_depth = args.count("(") - args.count(")")
+                    while paren_depth != 0 and idx < n:
+                        stripped = body[idx].stripped.rstrip(";")
+                        idx += 1
+                        full_args_lines.append(stripped)
+                        paren_depth += stripped.count("(") - stripped.count(")")
+                    if paren_depth != 0:
                         raise SansScriptError(code="E_PARSE", message="Unbalanced parentheses in multiline argument.", line=line.number)
 
+                    all_text = " ".join(full_args_lines)
+                    # The args are the outermost balanced parens.
+                    args = all_text[: all_text.rfind(")") + 1]
 
-                transform = self._parse_transform_clause(kw, args, line.number)
-                steps.append(transform)
+                yield kw, args, line.number
 
-            elif processed_lowered.startswith("sort()") or processed_lowered.startswith("summary()") or processed_lowered.startswith("aggregate()"):
-                 raise SansScriptError(code="E_NOT_IMPL", message="Implicit source builders in pipeline not yet implemented.", line=line.number)
+            elif lowered.startswith(_IMPLICIT_BUILDER_PREFIXES):
+                raise SansScriptError(code="E_NOT_IMPL", message="Implicit source builders in pipeline not yet implemented.", line=line.number)
             else:
                 raise SansScriptError(
                     code="E_PARSE",
                     message=f"Unknown pipeline transform: '{content}'.",
                     line=line.number,
                 )
-        return steps
 
     def _parse_builder(self, kind: str, source: TableExpr, remainder: str, line: _Line) -> tuple[BuilderExpr, str, int]:
         config: Dict[str, Any] = {}
@@ -911,12 +947,17 @@ class SansScriptParser:
                 else:
                     break
 
-            match = re.match(rf"\.({IDENT_RE})\(([^)]*)\)(.*)", curr_rem)
-            if not match:
+            if not curr_rem.startswith("."):
+                break
+            head, sep, tail = curr_rem[1:].partition("(")
+            if not sep or not (head.isascii() and head.isidentifier()):
                 break
-            method = match.group(1).lower()
-            args_str = match.group(2).strip()
-            curr_rem = match.group(3).strip()
+            args_str, sep, rest = tail.partition(")")
+            if not sep:
+                break
+            method = head.lower()
+            args_str = args_str.strip()
+            curr_rem = rest.strip()
             
             if kind == "sort":
                 if method == "by":
@@ -925,7 +966,7 @@ class SansScriptParser:
                     config["nodupkey"] = args_str.lower() == "true"
                 else:
                     raise SansScriptError(code="E_PARSE", message=f"Unknown sort builder method: {method}", line=curr_line)
-            elif kind in ("summary", "aggregate"):
+            elif kind in _AGG_KINDS:
                 if method == "class":
                     config["class"] = self._parse_columns(args_str, curr_line)
                 elif method == "var":
@@ -947,9 +988,9 @@ class SansScriptParser:
                 # Peek at next line for postfix keywords or bracket sugar
                 next_line = self._peek_content_line()
                 if next_line:
-                    s = next_line.stripped.lower()
+                    s = next_line.lowered
                     # Check if it looks like a postfix clause or bracket sugar
-                    if s.startswith("[") or any(s.startswith(kw + " ") or s.startswith(kw + "(") for kw in ["select", "filter", "derive", "rename", "drop", "update!", "cast"]):
+                    if s.startswith(_POSTFIX_LINE_PREFIXES):
                         self._next_content_line() # consume it
                         curr_rem = next_line.stripped
                         curr_end_line = next_line.number
@@ -960,7 +1001,7 @@ class SansScriptParser:
 
             if curr_rem.startswith("["):
                 # Bracket sugar for select
-                match = re.match(r"\[([^\]]+)\](.*)", curr_rem)
+                match = _BRACKET_SELECT_RE.match(curr_rem)
                 if not match:
                     break
                 cols = self._parse_columns(match.group(1), curr_end_line)
@@ -969,21 +1010,28 @@ class SansScriptParser:
                 curr_rem = match.group(2).strip()
                 continue
 
-            match = re.match(r"(select|filter|derive|rename|drop|update!|cast)(?:\s+|\()", curr_rem, re.IGNORECASE)
+            match = _POSTFIX_KW_RE.match(_ascii_lower(curr_rem))
             if not match:
                 break
             
-            kind = match.group(1).lower()
+            kind = match.group(1)
             # We need to find the full args_part. 
             # If it started with '(', we need to find the matching ')'
             if curr_rem[len(kind)] == "(":
                  inner, next_rem = self._extract_balanced_parens(curr_rem[len(kind):], curr_end_line)
-                 this_args = "(" + inner + ")"
+                 this_args = f"({inner})"
                  curr_rem = next_rem
             else:
                  args_part = curr_rem[len(kind):].strip()
                  # Simple heuristic: split by next keyword
-                 next_kw_match = re.search(r"\s+(select|filter|derive|rename|drop|update!|cast)(?:\s+|\()", args_part, re.IGNORECASE)
+                 # Most clauses hold no further keyword; skip the regex unless one
+                 # appears as a substring.
+                 args_lowered = _ascii_lower(args_part)
+                 next_kw_match = (
+                     _NEXT_POSTFIX_KW_RE.search(args_lowered)
+                     if any(kw in args_lowered for kw in _TRANSFORM_KWS)
+                     else None
+                 )
                  if next_kw_match:
                      this_args = args_part[:next_kw_match.start()].strip()
                      curr_rem = args_part[next_kw_match.start():].strip()
@@ -1004,42 +1052,41 @@ class SansScriptParser:
         return curr_expr
 
     def _parse_transform_clause(self, kind: str, args_str: str, line_no: int) -> TableTransform:
-        params: Dict[str, Any] = {}
-        if kind == "select":
-            params["keep"] = self._parse_columns(args_str, line_no)
-        elif kind == "drop":
-            if args_str.startswith("(") and args_str.endswith(")"):
-                args_str = args_str[1:-1].strip()
-            params["drop"] = self._parse_columns(args_str, line_no)
-        elif kind == "filter":
-            # Strip parens if present
-            if args_str.startswith("(") and args_str.endswith(")"):
-                args_str = args_str[1:-1].strip()
-            params["predicate"] = self._parse_expr(args_str, line_no)
-        elif kind == "derive":
-            # derive(a = 1, update! b = 2)
-            if args_str.startswith("(") and args_str.endswith(")"):
-                args_str = args_str[1:-1].strip()
-            params["assignments"] = self._parse_derive_assignments(args_str, line_no)
-        elif kind == "update!":
-            # update!(a = 1, b = 2) — all assignments overwrite existing columns
-            if args_str.startswith("(") and args_str.endswith(")"):
-                args_str = args_str[1:-1].strip()
-            raw = self._parse_derive_assignments(args_str, line_no)
-            for a in raw:
-                a["allow_overwrite"] = True
-            params["assignments"] = raw
-        elif kind == "rename":
-            if args_str.startswith("(") and args_str.endswith(")"):
-                args_str = args_str[1:-1].strip()
-            params["mappings"] = self._parse_rename_mappings(args_str, line_no)
-        elif kind == "cast":
-            if args_str.startswith("(") and args_str.endswith(")"):
-                args_str = args_str[1:-1].strip()
-            params["casts"] = self._parse_cast_specs(args_str, line_no)
-
+        handler = self._transform_dispatch.get(kind)
+        params: Dict[str, Any] = handler(args_str, line_no) if handler else {}
         return TableTransform(kind=kind, params=params, span=SourceSpan(line_no, line_no))
 
+    @staticmethod
+    def _unparen(s: str) -> str:
+        """Strip one pair of enclosing parens, if present."""
+        return s[1:-1].strip() if s.startswith("(") and s.endswith(")") else s
+
+    def _tf_select(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        return {"keep": self._parse_columns(args_str, line_no)}
+
+    def _tf_drop(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        return {"drop": self._parse_columns(self._unparen(args_str), line_no)}
+
+    def _tf_filter(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        return {"predicate": self._parse_expr(self._unparen(args_str), line_no)}
+
+    def _tf_derive(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        # derive(a = 1, update! b = 2)
+        return {"assignments": self._parse_derive_assignments(self._unparen(args_str), line_no)}
+
+    def _tf_update(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        # update!(a = 1, b = 2) — all assignments overwrite existing columns
+        raw = self._parse_derive_assignments(self._unparen(args_str), line_no)
+        for a in raw:
+            a["allow_overwrite"] = True
+        return {"assignments": raw}
+
+    def _tf_rename(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        return {"mappings": self._parse_rename_mappings(self._unparen(args_str), line_no)}
+
+    def _tf_cast(self, args_str: str, line_no: int) -> Dict[str, Any]:
+        return {"casts": self._parse_cast_specs(self._unparen(args_str), line_no)}
+
     def _parse_derive_assignments(self, text: str, line_no: int) -> List[Dict[str, Any]]:
         parts = self._split_by_comma_respecting_parens(text)
         assignments = []
@@ -1050,13 +1097,13 @@ class SansScriptParser:
                 allow_overwrite = True
                 part = part[7:].strip()
             
-            match = re.match(rf"({IDENT_RE})\s*=\s*(.+)", part)
+            match = _ASSIGN_RE.match(part)
             if not match:
                 raise SansScriptError(code="E_PARSE", message=f"Malformed derive assignment: {part}", line=line_no)
             
             assignments.append({
                 "type": "assign",
-                "target": match.group(1),
+                "target": sys.intern(match.group(1)),
                 "expr": self._parse_expr(match.group(2).strip(), line_no),
                 "allow_overwrite": allow_overwrite
             })
@@ -1068,10 +1115,12 @@ class SansScriptParser:
         for part in parts:
             part = part.strip()
             if not part: continue
-            if "->" not in part:
+            old, sep, new = part.partition("->")
+            if not sep:
                  raise SansScriptError(code="E_PARSE", message=f"Rename mapping must use '->': {part}", line=line_no)
-            old, new = part.split("->")
-            mappings[old.strip()] = new.strip()
+            if "->" in new:
+                 raise SansScriptError(code="E_PARSE", message=f"Rename mapping must have exactly one '->': {part}", line=line_no)
+            mappings[sys.intern(old.strip())] = sys.intern(new.strip())
         return mappings
 
     def _parse_cast_specs(self, text: str, line_no: int) -> List[Dict[str, Any]]:
@@ -1082,14 +1131,14 @@ class SansScriptParser:
             part = part.strip()
             if not part:
                 continue
-            if "->" not in part:
+            main, sep, rest = part.partition("->")
+            if not sep:
                 raise SansScriptError(
                     code="E_PARSE",
                     message=f"Cast spec must use 'col -> to': {part}",
                     line=line_no,
                 )
-            main, rest = part.split("->", 1)
-            col = main.strip()
+            col = sys.intern(main.strip())
             rest = rest.strip()
             # rest is "to [on_error=...] [trim=...]"
             to_end = rest.find(" on_error=")
@@ -1105,13 +1154,13 @@ class SansScriptParser:
                 on_error = "fail"
                 trim = False
                 if "on_error=" in tail:
-                    m = re.search(r"on_error\s*=\s*(\w+)", tail, re.IGNORECASE)
+                    m = _CAST_ON_ERROR_RE.search(tail.lower())
                     if m:
                         on_error = m.group(1).strip().lower()
                 if "trim=" in tail:
-                    m = re.search(r"trim\s*=\s*(\w+)", tail, re.IGNORECASE)
+                    m = _CAST_TRIM_RE.search(tail.lower())
                     if m:
-                        trim = m.group(1).strip().lower() in ("true", "1", "yes")
+                        trim = m.group(1).strip().lower() in _TRUTHY_FLAGS
             casts.append({"col": col, "to": to, "on_error": on_error, "trim": trim})
         return casts
 
@@ -1128,9 +1177,9 @@ class SansScriptParser:
         for part in parts:
             part = part.strip()
             if not part: continue
-            if "->" not in part:
+            lhs, sep, rhs = part.partition("->")
+            if not sep:
                  raise SansScriptError(code="E_PARSE", message=f"Map entry must use '->': {part}", line=line_no)
-            lhs, rhs = part.split("->", 1)
             lhs = lhs.strip()
             rhs = rhs.strip()
             
@@ -1146,34 +1195,39 @@ class SansScriptParser:
         return MapExpr(entries=entries, span=SourceSpan(line_no, line_no))
 
     def _split_by_comma_respecting_parens(self, text: str) -> List[str]:
-        parts = []
-        curr = ""
-        depth = 0
-        for char in text:
-            if char == "(": depth += 1
-            elif char == ")": depth -= 1
-            elif char == "," and depth == 0:
-                parts.append(curr)
-                curr = ""
-                continue
-            curr += char
-        parts.append(curr)
-        return [p.strip() for p in parts if p.strip()]
+        if "(" not in text and ")" not in text:
+            parts = text.split(",")
+        else:
+            # Jump between delimiter characters instead of walking every char.
+            parts = []
+            start = 0
+            depth = 0
+            for m in _COMMA_OR_PAREN_RE.finditer(text):
+                char = m.group()
+                if char == "(": depth += 1
+                elif char == ")": depth -= 1
+                elif depth == 0:
+                    parts.append(text[start:m.start()])
+                    start = m.end()
+            parts.append(text[start:])
+        return [p for p in (part.strip() for part in parts) if p]
 
     def _parse_columns(self, segment: str, line_no: int, *, lower: bool = False) -> List[str]:
-        cols = [part.strip().strip(",") for part in re.split(r"[\s,]+", segment) if part.strip()]
+        cols = segment.translate(_COMMA_TO_SPACE).split()
         if not cols:
             raise SansScriptError(
                 code="E_PARSE",
                 message="Column list cannot be empty.",
                 line=line_no,
             )
+        # Column names recur across a script; intern so later dict/set lookups
+        # compare by identity first.
         if lower:
-            return [col.lower() for col in cols]
-        return cols
+            return [sys.intern(col.lower()) for col in cols]
+        return list(map(sys.intern, cols))
 
     def _parse_columns_with_types(self, segment: str, line_no: int) -> tuple[List[str], Optional[Dict[str, Type]]]:
-        raw_cols = [part.strip().strip(",") for part in re.split(r"[\s,]+", segment) if part.strip()]
+        raw_cols = segment.translate(_COMMA_TO_SPACE).split()
         if not raw_cols:
             raise SansScriptError(
                 code="E_PARSE",
@@ -1185,7 +1239,7 @@ class SansScriptParser:
         for token in raw_cols:
             if ":" in token:
                 name, type_str = token.split(":", 1)
-                name = name.strip()
+                name = sys.intern(name.strip())
                 type_str = type_str.strip()
                 if not name or not type_str:
                     raise SansScriptError(
@@ -1204,12 +1258,29 @@ class SansScriptParser:
                 columns.append(name)
                 column_types[name] = col_type
             else:
-                columns.append(token)
+                columns.append(sys.intern(token))
         return columns, (column_types or None)
 
     def _collect_block(self, header: _Line) -> tuple[List[_Line], int]:
         body: List[_Line] = []
-        depth = 0
+        # Fast path: most blocks are flat, so only watch for `end` until the
+        # first nested `... do` shows up, then hand off to the depth tracker.
+        while True:
+            line = self._next_content_line()
+            if not line:
+                raise SansScriptError(
+                    code="E_PARSE",
+                    message="Missing 'end' for block.",
+                    line=header.number,
+                )
+            cleaned = line.lowered.rstrip(";")
+            if cleaned == "end":
+                return body, line.number
+            body.append(line)
+            if cleaned.endswith(" do"):
+                break
+
+        depth = 1
         while True:
             line = self._next_content_line()
             if not line:
@@ -1218,7 +1289,7 @@ class SansScriptParser:
                     message="Missing 'end' for block.",
                     line=header.number,
                 )
-            cleaned = line.stripped.rstrip(";").lower()
+            cleaned = line.lowered.rstrip(";")
             if cleaned == "end":
                 if depth == 0:
                     return body, line.number
@@ -1240,10 +1311,9 @@ class SansScriptParser:
                     message=f"Missing ')' for {start_word}.",
                     line=header.number,
                 )
-            for char in line.text:
-                if char == "(": depth += 1
-                elif char == ")": depth -= 1
-            
+            text = line.text
+            depth += text.count("(") - text.count(")")
+
             if depth == 0:
                 # We need to be careful if there's trailing content on the same line as ')'
                 return body, line.number
@@ -1252,8 +1322,7 @@ class SansScriptParser:
     def _ensure_sans_expr_rules(self, text: str, line_no: int) -> None:
         if not self._file_name:
             return
-        tokens = find_legacy_tokens(text)
-        if tokens:
+        if _has_legacy_tokens(text):
             raise SansScriptError(
                 code="E_BAD_EXPR",
                 message="Use symbolic comparison operators (==, !=, <, <=, >, >=) in sans scripts.",
@@ -1261,10 +1330,20 @@ class SansScriptParser:
             )
 
     def _parse_expr(self, text: str, line_no: int) -> ExprNode:
+        # Fast path: bare column refs and integer literals (e.g. filter(active))
+        # produce the same node as the full tokenizer + parser.
+        trivial = text.strip()
+        if _TRIVIAL_IDENT_RE.fullmatch(trivial) and trivial.lower() not in _RESERVED_EXPR_WORDS:
+            return col(sys.intern(trivial))
+        if trivial.isascii() and trivial.isdigit():
+            return lit(int(trivial))
         try:
             assert self._file_name is not None
             self._ensure_sans_expr_rules(text, line_no)
-            return parse_expression_from_string(text, self._file_name)
+            node = self._expr_cache.get(trivial)
+            if node is None:
+                node = self._expr_cache[trivial] = parse_expression_from_string(trivial, self._file_name)
+            return node
         except ValueError as exc:
             raise SansScriptError(
                 code="E_BAD_EXPR",
@@ -1272,38 +1351,54 @@ class SansScriptParser:
                 line=line_no,
             )
 
-    def _peek_content_line(self) -> Optional[_Line]:
+    def _get_line(self, idx: int) -> _Line:
+        line = self._lines[idx]
+        if line is None:
+            lowered = self._lowered_lines[idx] if self._lowered_lines is not None else None
+            line = _Line(self._raw_lines[idx].rstrip("\r"), idx + 1, lowered)
+            self._lines[idx] = line
+        return line
+
+    def _find_content_idx(self) -> int:
+        """Index of the next non-blank line at or after self._idx (len if none)."""
+        peeked = self._peeked
+        if peeked is not None and peeked[0] == self._idx:
+            return peeked[1]
         idx = self._idx
-        while idx < len(self._lines):
-            line = self._lines[idx]
-            stripped = line.stripped
-            if not stripped:
-                idx += 1
-                continue
-            return line
-        return None
+        n = len(self._lines)
+        raw_lines = self._raw_lines
+        # Blank and comment-only lines are tested on the raw text, on demand, so
+        # skipping them never builds a _Line and lines consumed raw (block
+        # bodies) are never classified.
+        while idx < n and _is_skippable(raw_lines[idx]):
+            idx += 1
+        # Remember the result so a peek followed by a consume scans blanks once.
+        self._peeked = (self._idx, idx)
+        return idx
+
+    def _peek_content_line(self) -> Optional[_Line]:
+        idx = self._find_content_idx()
+        return self._get_line(idx) if idx < len(self._lines) else None
 
     def _next_content_line(self) -> Optional[_Line]:
-        while self._idx < len(self._lines):
-            line = self._lines[self._idx]
-            self._idx += 1
-            stripped = line.stripped
-            if not stripped:
-                continue
-            return line
-        return None
+        idx = self._find_content_idx()
+        if idx >= len(self._lines):
+            self._idx = idx
+            return None
+        self._idx = idx + 1
+        return self._get_line(idx)
 
     def _next_line_raw(self) -> _Line | None:
         if self._idx >= len(self._lines):
             return None
-        line = self._lines[self._idx]
+        line = self._get_line(self._idx)
         self._idx += 1
         return line
 
     def _strip_quotes(self, token: str, line_no: int) -> str:
         value = token.strip()
-        if len(value) >= 2 and value[0] == value[-1] and value[0] in {"'", '"'}:
-            return value[1:-1]
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in _QUOTE_CHARS:
+            return sys.intern(value[1:-1])
         if not value: # Handle empty string case
             return ""
         raise SansScriptError(
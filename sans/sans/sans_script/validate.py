@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Set, Union, Any
+import sys
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from io import StringIO
 import csv
 from .ast import (
@@ -13,19 +14,31 @@ from sans.types import Type
 from sans.type_infer import TypeInferenceError, infer_expr_type
 
 
+_AGG_KINDS = frozenset({"summary", "aggregate"})
+_DEMO_IN_COLUMNS = ("a", "b", "c")
+# cast(col -> to) target names; anything else casts to UNKNOWN.
+_CAST_TYPES = {"int": Type.INT, "decimal": Type.DECIMAL, "str": Type.STRING, "bool": Type.BOOL}
+# Exact types the parser produces for const literals (subclasses are not expected).
+_CONST_TYPES = frozenset({int, str, bool, type(None)})
+
+
 def _is_const_literal(val: Any) -> bool:
     """True if val is an allowed const literal: int, str, bool, None (null), or decimal {type, value}."""
-    if val is None or isinstance(val, (int, str, bool)):
+    if type(val) in _CONST_TYPES:
         return True
     if isinstance(val, dict) and val.get("type") == "decimal" and isinstance(val.get("value"), str):
         return True
     return False
 
 
+def _available_columns_hint(schema: Dict[str, Type], sort: bool = False) -> str:
+    return f"Available columns: {', '.join(sorted(schema) if sort else schema)}"
+
+
 class SemanticValidator:
     def __init__(self, script: SansScript, initial_tables: Set[str]):
         self.script = script
-        self.tables: Set[str] = set(initial_tables)
+        self.tables: Set[str] = set(map(sys.intern, initial_tables))
         self.datasources: Dict[str, DatasourceDeclaration] = {} # New: track datasources
         self.table_schemas: Dict[str, Dict[str, Type]] = {}
         self.scalars: Dict[str, int] = {}  # name -> line_defined
@@ -33,294 +46,376 @@ class SemanticValidator:
         self.used_scalars: Set[str] = set()
         self.kinds: Dict[str, str] = {}  # name -> 'scalar' | 'table'
         self.warnings: List[Dict[str, Any]] = []
+        # (id(expr), id(schema)) -> (schema, type). The schema is kept alive in the
+        # value so its id cannot be reused while the entry exists. Parsed
+        # expressions are shared for identical text, so the same node can recur.
+        self._expr_type_memo: Dict[Tuple[int, int], Tuple[Optional[Dict[str, Type]], Type]] = {}
+        self._env_scratch: Dict[str, Type] = {}
+        # Datasource name -> schema seen by from(); shared, so read-only like table schemas.
+        self._datasource_schemas: Dict[str, Optional[Dict[str, Type]]] = {}
+        # AST node classes are final, so exact-type lookup replaces isinstance chains.
+        self._stmt_dispatch = {
+            LetBinding: self._validate_let,
+            ConstDecl: self._validate_const,
+            DatasourceDeclaration: self._validate_datasource_decl,
+            TableBinding: self._validate_table_binding,
+            SaveStmt: self._validate_save,
+            AssertStmt: self._validate_assert,
+        }
+        self._table_expr_dispatch = {
+            FromExpr: self._validate_from,
+            TableNameExpr: self._validate_table_name,
+            PipelineExpr: self._validate_pipeline,
+            PostfixExpr: self._validate_postfix,
+            BuilderExpr: self._validate_builder,
+        }
+        self._transform_dispatch = {
+            "select": self._validate_select,
+            "drop": self._validate_drop,
+            "filter": self._validate_filter,
+            "derive": self._validate_derive,
+            "update!": self._validate_derive,
+            "rename": self._validate_rename,
+            "cast": self._validate_cast,
+        }
 
     def validate(self):
         for stmt in self.script.statements:
             self._validate_stmt(stmt)
         
-        if self.script.terminal_expr:
-            self._validate_table_expr(self.script.terminal_expr)
-
-        # Check for unused scalars
-        for name, line in self.scalars.items():
-            if name not in self.used_scalars:
-                self.warnings.append({
-                    "code": "W_UNUSED_LET",
-                    "message": f"Unused let binding '{name}'.",
-                    "line": line
-                })
+        terminal = self.script.terminal_expr
+        if terminal:
+            # A bare reference to a known table has nothing left to check and its
+            # schema is unused here; anything else is validated like a binding.
+            if not (type(terminal) is TableNameExpr and terminal.name in self.tables):
+                self._validate_table_expr(terminal)
+
+        # Check for unused scalars. The set difference runs in C; the walk over
+        # scalars (only when something is unused) keeps warnings in definition order.
+        unused = self.scalars.keys() - self.used_scalars
+        if unused:
+            for name, line in self.scalars.items():
+                if name in unused:
+                    self.warnings.append({
+                        "code": "W_UNUSED_LET",
+                        "message": f"Unused let binding '{name}'.",
+                        "line": line
+                    })
 
     def _validate_stmt(self, stmt: SansScriptStmt):
-        if isinstance(stmt, LetBinding):
-            self._check_kind_lock(stmt.name, 'scalar', stmt.span.start)
-            expr_type = self._validate_scalar_expr(stmt.expr, stmt.span.start)
-            self.scalars[stmt.name] = stmt.span.start
-            self.scalar_types[stmt.name] = expr_type
-            self.kinds[stmt.name] = 'scalar'
-        elif isinstance(stmt, ConstDecl):
-            for name, val in stmt.bindings.items():
-                self._check_kind_lock(name, 'scalar', stmt.span.start)
-                if not _is_const_literal(val):
-                    raise SansScriptError(
-                        code="E_BAD_EXPR",
-                        message=f"const allows only int, decimal, string, bool, null; got {type(val).__name__}.",
-                        line=stmt.span.start,
-                    )
-                self.scalars[name] = stmt.span.start
-                self.scalar_types[name] = Type.UNKNOWN if val is None else Type.UNKNOWN
-                try:
-                    self.scalar_types[name] = infer_expr_type({"type": "lit", "value": val}, {})
-                except TypeInferenceError as err:
-                    raise SansScriptError(code=err.code, message=err.message, line=stmt.span.start)
-                self.kinds[name] = 'scalar'
-        elif isinstance(stmt, DatasourceDeclaration):
-            self._check_kind_lock(stmt.name, 'datasource', stmt.span.start)
-            if stmt.name in self.datasources:
-                raise SansScriptError(
-                    code="E_DUPLICATE_DATASOURCE",
-                    message=f"Datasource '{stmt.name}' already declared.",
-                    line=stmt.span.start
-                )
-            self.datasources[stmt.name] = stmt
-            self.kinds[stmt.name] = 'datasource'
-        elif isinstance(stmt, TableBinding):
-            self._check_kind_lock(stmt.name, 'table', stmt.span.start)
-            schema = self._validate_table_expr(stmt.expr)
-            self.tables.add(stmt.name)
-            if schema is not None:
-                self.table_schemas[stmt.name] = schema
-            self.kinds[stmt.name] = 'table'
-        elif isinstance(stmt, SaveStmt):
-            if stmt.table not in self.tables:
-                raise SansScriptError(
-                    code="E_UNDEFINED_TABLE",
-                    message=f"Save references table '{stmt.table}' which is not defined.",
-                    line=stmt.span.start,
-                )
-        elif isinstance(stmt, AssertStmt):
-            pred_type = self._validate_scalar_expr(stmt.predicate, stmt.span.start, None)
-            if pred_type != Type.BOOL:
-                code = "E_TYPE_UNKNOWN" if pred_type == Type.UNKNOWN else "E_TYPE"
+        handler = self._stmt_dispatch.get(type(stmt))
+        if handler is not None:
+            handler(stmt)
+
+    def _validate_let(self, stmt: LetBinding):
+        self._check_kind_lock(stmt.name, 'scalar', stmt.span.start)
+        expr_type = self._validate_scalar_expr(stmt.expr, stmt.span.start)
+        self.scalars[stmt.name] = stmt.span.start
+        self.scalar_types[stmt.name] = expr_type
+        self._declare(stmt.name, 'scalar')
+
+    def _validate_const(self, stmt: ConstDecl):
+        for name, val in stmt.bindings.items():
+            self._check_kind_lock(name, 'scalar', stmt.span.start)
+            if not _is_const_literal(val):
                 raise SansScriptError(
-                    code=code,
-                    message=f"Assert predicate must be bool, got {pred_type.value}.",
+                    code="E_BAD_EXPR",
+                    message=f"const allows only int, decimal, string, bool, null; got {type(val).__name__}.",
                     line=stmt.span.start,
                 )
+            self.scalars[name] = stmt.span.start
+            self.scalar_types[name] = Type.UNKNOWN if val is None else Type.UNKNOWN
+            try:
+                self.scalar_types[name] = infer_expr_type({"type": "lit", "value": val}, {})
+            except TypeInferenceError as err:
+                raise SansScriptError(code=err.code, message=err.message, line=stmt.span.start)
+            self._declare(name, 'scalar')
+
+    def _validate_datasource_decl(self, stmt: DatasourceDeclaration):
+        self._check_kind_lock(stmt.name, 'datasource', stmt.span.start)
+        if stmt.name in self.datasources:
+            raise SansScriptError(
+                code="E_DUPLICATE_DATASOURCE",
+                message=f"Datasource '{stmt.name}' already declared.",
+                line=stmt.span.start
+            )
+        self.datasources[stmt.name] = stmt
+        self._declare(stmt.name, 'datasource')
+
+    def _validate_table_binding(self, stmt: TableBinding):
+        self._check_kind_lock(stmt.name, 'table', stmt.span.start)
+        schema = self._validate_table_expr(stmt.expr)
+        self.tables.add(stmt.name)
+        if schema is not None:
+            self.table_schemas[stmt.name] = schema
+        self._declare(stmt.name, 'table')
+
+    def _validate_save(self, stmt: SaveStmt):
+        if stmt.table not in self.tables:
+            raise SansScriptError(
+                code="E_UNDEFINED_TABLE",
+                message=f"Save references table '{stmt.table}' which is not defined.",
+                line=stmt.span.start,
+            )
+
+    def _validate_assert(self, stmt: AssertStmt):
+        pred_type = self._validate_scalar_expr(stmt.predicate, stmt.span.start, None)
+        if pred_type != Type.BOOL:
+            code = "E_TYPE_UNKNOWN" if pred_type == Type.UNKNOWN else "E_TYPE"
+            raise SansScriptError(
+                code=code,
+                message=f"Assert predicate must be bool, got {pred_type.value}.",
+                line=stmt.span.start,
+            )
+
+    def _declare(self, name: str, kind: str):
+        self.kinds[name] = kind
+        # A new name can change how any col ref resolves; drop memoized types.
+        self._expr_type_memo.clear()
 
     def _check_kind_lock(self, name: str, kind: str, line: int):
-        if name in self.kinds and self.kinds[name] != kind:
+        existing = self.kinds.get(name)
+        if existing is not None and existing != kind:
             raise SansScriptError(
                 code="E_KIND_LOCK",
-                message=f"Name '{name}' is already defined as a {self.kinds[name]} and cannot be redefined as a {kind}.",
+                message=f"Name '{name}' is already defined as a {existing} and cannot be redefined as a {kind}.",
                 line=line
             )
 
     def _validate_table_expr(self, expr: TableExpr) -> Optional[Dict[str, Type]]:
         """Returns the column->type mapping produced by this expression if known."""
-        if isinstance(expr, FromExpr):
-            if expr.source in self.datasources:
-                expr.source_kind = "datasource"
-                # If datasource has explicit columns, use them as schema
-                ds = self.datasources[expr.source]
-                if ds.columns:
-                    schema: Dict[str, Type] = {}
-                    for col in ds.columns:
-                        if ds.column_types and col in ds.column_types:
-                            schema[col] = ds.column_types[col]
-                        else:
-                            schema[col] = Type.UNKNOWN
-                    return schema
-
-                # Infer inline_csv headers when available
-                if ds.kind == "inline_csv" and ds.inline_text:
-                    reader = csv.reader(StringIO(ds.inline_text.strip()))
-                    try:
-                        headers = next(reader)
-                    except StopIteration:
-                        headers = []
-                    return {c: Type.UNKNOWN for c in headers}
-
-                # Default schema for demo purposes or unknown datasources
-                if expr.source == "in": # Special handling for demo.sans
-                    return {c: Type.UNKNOWN for c in ["a", "b", "c"]}
-                return None # Schema unknown for other external sources without declaration
-            if expr.source in self.tables:
-                expr.source_kind = "table"
-                return self.table_schemas.get(expr.source)
-            known_tables = sorted(self.tables)
-            known_datasources = sorted(self.datasources.keys())
-            tables_hint = ", ".join(known_tables) if known_tables else "<none>"
-            ds_hint = ", ".join(known_datasources) if known_datasources else "<none>"
+        handler = self._table_expr_dispatch.get(type(expr))
+        return handler(expr) if handler is not None else None
+
+    def _validate_from(self, expr: FromExpr) -> Optional[Dict[str, Type]]:
+        ds = self.datasources.get(expr.source)
+        if ds is not None:
+            expr.source_kind = "datasource"
+            # Every from(ds) of the same datasource yields the same schema;
+            # build it (and parse inline CSV headers) once per datasource.
+            cache = self._datasource_schemas
+            if ds.name not in cache:
+                cache[ds.name] = self._datasource_schema(ds)
+            return cache[ds.name]
+        if expr.source in self.tables:
+            expr.source_kind = "table"
+            return self.table_schemas.get(expr.source)
+        raise self._undeclared_source_error(expr)
+
+    def _undeclared_source_error(self, expr: FromExpr) -> SansScriptError:
+        # Only reached when from() fails, so the name listings are never sorted
+        # on the success path.
+        known_tables = sorted(self.tables)
+        known_datasources = sorted(self.datasources)
+        tables_hint = ", ".join(known_tables) if known_tables else "<none>"
+        ds_hint = ", ".join(known_datasources) if known_datasources else "<none>"
+        return SansScriptError(
+            code="E_UNDECLARED_SOURCE",
+            message=(
+                f"Source '{expr.source}' is not declared as a table or datasource. "
+                f"Known tables: {tables_hint}. Known datasources: {ds_hint}."
+            ),
+            line=expr.span.start,
+        )
+
+    def _datasource_schema(self, ds: DatasourceDeclaration) -> Optional[Dict[str, Type]]:
+        # If datasource has explicit columns, use them as schema
+        if ds.columns:
+            schema: Dict[str, Type] = {}
+            for col in ds.columns:
+                if ds.column_types and col in ds.column_types:
+                    schema[col] = ds.column_types[col]
+                else:
+                    schema[col] = Type.UNKNOWN
+            return schema
+
+        # Infer inline_csv headers when available
+        if ds.kind == "inline_csv" and ds.inline_text:
+            reader = csv.reader(StringIO(ds.inline_text.strip()))
+            try:
+                headers = next(reader)
+            except StopIteration:
+                headers = []
+            return {sys.intern(c): Type.UNKNOWN for c in headers}
+
+        # Default schema for demo purposes or unknown datasources
+        if ds.name == "in": # Special handling for demo.sans
+            return {c: Type.UNKNOWN for c in _DEMO_IN_COLUMNS}
+        return None # Schema unknown for other external sources without declaration
+
+    def _validate_table_name(self, expr: TableNameExpr) -> Optional[Dict[str, Type]]:
+        if expr.name not in self.tables:
             raise SansScriptError(
-                code="E_UNDECLARED_SOURCE",
-                message=(
-                    f"Source '{expr.source}' is not declared as a table or datasource. "
-                    f"Known tables: {tables_hint}. Known datasources: {ds_hint}."
-                ),
-                line=expr.span.start,
+                code="E_UNDEFINED_TABLE",
+                message=f"Table '{expr.name}' is not defined.",
+                line=expr.span.start
             )
+        return self.table_schemas.get(expr.name)
+
+    def _validate_pipeline(self, expr: PipelineExpr) -> Optional[Dict[str, Type]]:
+        curr_schema = self._validate_table_expr(expr.source)
+        for step in expr.steps:
+            curr_schema = self._validate_transform(step, curr_schema)
+        return curr_schema
 
-        elif isinstance(expr, TableNameExpr):
-            if expr.name not in self.tables:
+    def _validate_postfix(self, expr: PostfixExpr) -> Optional[Dict[str, Type]]:
+        curr_schema = self._validate_table_expr(expr.source)
+        return self._validate_transform(expr.transform, curr_schema)
+
+    def _validate_builder(self, expr: BuilderExpr) -> Optional[Dict[str, Type]]:
+        self._validate_table_expr(expr.source)
+        if expr.kind == "sort":
+            if "by" not in expr.config:
                 raise SansScriptError(
-                    code="E_UNDEFINED_TABLE",
-                    message=f"Table '{expr.name}' is not defined.",
+                    code="E_SANS_VALIDATE_SORT_MISSING_BY",
+                    message="SORT builder requires a .by() clause.",
                     line=expr.span.start
                 )
-            return self.table_schemas.get(expr.name)
-        elif isinstance(expr, PipelineExpr):
-            curr_schema = self._validate_table_expr(expr.source)
-            for step in expr.steps:
-                curr_schema = self._validate_transform(step, curr_schema)
-            return curr_schema
-        elif isinstance(expr, PostfixExpr):
-            curr_schema = self._validate_table_expr(expr.source)
-            return self._validate_transform(expr.transform, curr_schema)
-        elif isinstance(expr, BuilderExpr):
-            self._validate_table_expr(expr.source)
-            if expr.kind == "sort":
-                if "by" not in expr.config:
-                    raise SansScriptError(
-                        code="E_SANS_VALIDATE_SORT_MISSING_BY",
-                        message="SORT builder requires a .by() clause.",
-                        line=expr.span.start
-                    )
-                return None # Schema unchanged
-            elif expr.kind in ("summary", "aggregate"):
-                class_cols = expr.config.get("class", [])
-                var_cols = expr.config.get("var", [])
-                stats = expr.config.get("stats", ["mean"])
-                
-                produced = list(class_cols)
-                for v in var_cols:
-                    for s in stats:
-                        produced.append(f"{v}_{s}")
-                return {c: Type.UNKNOWN for c in produced}
+            return None # Schema unchanged
+        elif expr.kind in _AGG_KINDS:
+            class_cols = expr.config.get("class", [])
+            var_cols = expr.config.get("var", [])
+            stats = expr.config.get("stats", ["mean"])
+            
+            produced = list(class_cols)
+            for v in var_cols:
+                for s in stats:
+                    produced.append(f"{v}_{s}")
+            return {c: Type.UNKNOWN for c in produced}
         return None
 
     def _validate_transform(self, transform: TableTransform, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
-        kind = transform.kind
-        params = transform.params
-        line = transform.span.start
-        
-        if kind == "select":
-            keep = params.get("keep", [])
-            if schema is not None:
-                for col in keep:
-                    if col not in schema:
-                        raise SansScriptError(
-                            code="E_UNKNOWN_COLUMN",
-                            message=f"Column '{col}' is not produced by the preceding operation.",
-                            line=line,
-                            hint=f"Available columns: {', '.join(schema.keys())}"
-                        )
-            return {c: schema.get(c, Type.UNKNOWN) for c in keep} if schema is not None else None
-        elif kind == "drop":
-            drop = params.get("drop", [])
-            if schema is not None:
-                for col in drop:
-                    if col not in schema:
-                        raise SansScriptError(
-                            code="E_COLUMN_NOT_FOUND",
-                            message=f"Column '{col}' not found; cannot drop.",
-                            line=line,
-                            hint=f"Available columns: {', '.join(sorted(schema.keys()))}",
-                        )
-                return {c: t for c, t in schema.items() if c not in drop}
+        # Input schemas are treated as read-only (they may be a bound table's or
+        # a datasource's schema); handlers that change columns build a new dict.
+        handler = self._transform_dispatch.get(transform.kind)
+        if handler is None:
+            return schema
+        return handler(transform.params, transform.span.start, schema)
+
+    def _validate_select(self, params: Dict[str, Any], line: int, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
+        keep = params.get("keep", [])
+        if schema is None:
             return None
-        elif kind == "filter":
-            pred_type = self._validate_scalar_expr(params["predicate"], line, schema)
-            if pred_type != Type.BOOL:
-                code = "E_TYPE_UNKNOWN" if pred_type == Type.UNKNOWN else "E_TYPE"
+        # Check and build the projected schema in one pass over keep, with one
+        # probe per column (schema values are Type members, never None).
+        selected: Dict[str, Type] = {}
+        for col in keep:
+            col_type = schema.get(col)
+            if col_type is None:
                 raise SansScriptError(
-                    code=code,
-                    message=f"Filter predicate must be bool, got {pred_type.value}.",
+                    code="E_UNKNOWN_COLUMN",
+                    message=f"Column '{col}' is not produced by the preceding operation.",
                     line=line,
+                    hint=_available_columns_hint(schema)
                 )
-            return schema
-        elif kind in ("derive", "update!"):
-            # Rule: Sequential evaluation, no cycles, no implicit overwrites
-            # We track "new" columns created in this derive block
-            new_schema = dict(schema) if schema is not None else None
-
-            for assign in params["assignments"]:
-                target = assign["target"]
-                expr = assign["expr"]
-                allow_overwrite = assign.get("allow_overwrite", False)
-                
-                # Enforce overwrite rules
-                if allow_overwrite:
-                    # 'update!' assignment: target MUST exist
-                    if new_schema is not None and target not in new_schema:
-                        raise SansScriptError(
-                            code="E_INVALID_UPDATE",
-                            message=f"Attempted to update nonexistent column '{target}'. Use '{target} = ...' for new columns.",
-                            line=line
-                        )
+            selected[col] = col_type
+        return selected
+
+    def _validate_drop(self, params: Dict[str, Any], line: int, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
+        drop = params.get("drop", [])
+        if schema is not None:
+            drop_set = set(drop)
+            # Subset test against the keys view runs in C; only on failure walk
+            # drop in order to report the first missing column.
+            if not drop_set <= schema.keys():
+                col = next(c for c in drop if c not in schema)
+                raise SansScriptError(
+                    code="E_COLUMN_NOT_FOUND",
+                    message=f"Column '{col}' not found; cannot drop.",
+                    line=line,
+                    hint=_available_columns_hint(schema, sort=True),
+                )
+            return {c: t for c, t in schema.items() if c not in drop_set}
+        return None
+
+    def _validate_filter(self, params: Dict[str, Any], line: int, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
+        pred_type = self._validate_scalar_expr(params["predicate"], line, schema)
+        if pred_type != Type.BOOL:
+            code = "E_TYPE_UNKNOWN" if pred_type == Type.UNKNOWN else "E_TYPE"
+            raise SansScriptError(
+                code=code,
+                message=f"Filter predicate must be bool, got {pred_type.value}.",
+                line=line,
+            )
+        return schema
+
+    def _validate_derive(self, params: Dict[str, Any], line: int, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
+        # Rule: Sequential evaluation, no cycles, no implicit overwrites
+        # We track "new" columns created in this derive block. The input schema
+        # is shared, so it is copied on the first write rather than up front.
+        new_schema = schema
+        owned = False
+
+        for assign in params["assignments"]:
+            target = assign["target"]
+            expr = assign["expr"]
+            allow_overwrite = assign.get("allow_overwrite", False)
+
+            # Enforce overwrite rules
+            if allow_overwrite:
+                # 'update!' assignment: target MUST exist
+                if new_schema is not None and target not in new_schema:
+                    raise SansScriptError(
+                        code="E_INVALID_UPDATE",
+                        message=f"Attempted to update nonexistent column '{target}'. Use '{target} = ...' for new columns.",
+                        line=line
+                    )
+            else:
+                # Plain assignment: target MUST NOT exist
+                if new_schema is not None and target in new_schema:
+                    raise SansScriptError(
+                        code="E_STRICT_MUTATION",
+                        message=f"Column '{target}' already exists. Use 'update! {target} = ...' to overwrite.",
+                        line=line
+                    )
+
+            # RHS sees columns created SO FAR in this block + previous schema
+            expr_type = self._validate_scalar_expr(expr, line, new_schema)
+            if new_schema is not None:
+                if not owned:
+                    # A fresh dict has no memoized types yet, so nothing to invalidate.
+                    new_schema = dict(new_schema)
+                    owned = True
                 else:
-                    # Plain assignment: target MUST NOT exist
-                    if new_schema is not None and target in new_schema:
-                        raise SansScriptError(
-                            code="E_STRICT_MUTATION",
-                            message=f"Column '{target}' already exists. Use 'update! {target} = ...' to overwrite.",
-                            line=line
-                        )
-                
-                # RHS sees columns created SO FAR in this block + previous schema
-                # Pass a copy of new_schema for scalar expr validation
-                expr_type = self._validate_scalar_expr(expr, line, new_schema)
-                if new_schema is not None:
-                    new_schema[target] = expr_type
-            return new_schema
-        elif kind == "rename":
-            mappings = params["mappings"]
-            if schema is not None:
-                # rename(old -> new) is destructive
-                final_schema: Dict[str, Type] = {}
-                old_cols_to_rename = set(mappings.keys())
-                
-                for c, t in schema.items():
-                    if c in old_cols_to_rename:
-                        final_schema[mappings[c]] = t
-                        old_cols_to_rename.remove(c) # Mark as successfully renamed
-                    else:
-                        final_schema[c] = t
-                
-                # Check if we tried to rename a non-existent column
-                if old_cols_to_rename: # if set is not empty
-                    non_existent = next(iter(old_cols_to_rename)) # Just pick one for the error message
+                    # new_schema changes in place (same id); memoized types may be stale.
+                    self._expr_type_memo.clear()
+                new_schema[target] = expr_type
+        return new_schema
+
+    def _validate_rename(self, params: Dict[str, Any], line: int, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
+        mappings = params["mappings"]
+        if schema is not None:
+            # rename(old -> new) is destructive. mappings is already a dict, so
+            # check sources against the schema directly instead of copying the
+            # keys into a scratch set and removing them as they match.
+            non_existent = next((old for old in mappings if old not in schema), None)
+            if non_existent is not None:
+                raise SansScriptError(
+                    code="E_UNKNOWN_COLUMN",
+                    message=f"Cannot rename non-existent column '{non_existent}'.",
+                    line=line,
+                    hint=_available_columns_hint(schema)
+                )
+            final_schema: Dict[str, Type] = {mappings.get(c, c): t for c, t in schema.items()}
+            return final_schema
+        return None
+
+    def _validate_cast(self, params: Dict[str, Any], line: int, schema: Optional[Dict[str, Type]]) -> Optional[Dict[str, Type]]:
+        casts = params.get("casts") or []
+        if schema is not None:
+            # Schemas from table names and sources are shared; copy before
+            # changing column types.
+            schema = dict(schema)
+            for c in casts:
+                col = c.get("col", "")
+                if col not in schema:
                     raise SansScriptError(
                         code="E_UNKNOWN_COLUMN",
-                        message=f"Cannot rename non-existent column '{non_existent}'.",
+                        message=f"Cannot cast non-existent column '{col}'.",
                         line=line,
-                        hint=f"Available columns: {', '.join(schema.keys())}"
+                        hint=_available_columns_hint(schema),
                     )
-                return final_schema
-            return None
-        elif kind == "cast":
-            casts = params.get("casts") or []
-            if schema is not None:
-                for c in casts:
-                    col = c.get("col", "")
-                    if col not in schema:
-                        raise SansScriptError(
-                            code="E_UNKNOWN_COLUMN",
-                            message=f"Cannot cast non-existent column '{col}'.",
-                            line=line,
-                            hint=f"Available columns: {', '.join(schema.keys())}",
-                        )
-                    to = (c.get("to") or "").lower()
-                    if to == "int":
-                        schema[col] = Type.INT
-                    elif to == "decimal":
-                        schema[col] = Type.DECIMAL
-                    elif to == "str":
-                        schema[col] = Type.STRING
-                    elif to == "bool":
-                        schema[col] = Type.BOOL
-                    else:
-                        schema[col] = Type.UNKNOWN
-            return schema
+                schema[col] = _CAST_TYPES.get((c.get("to") or "").lower(), Type.UNKNOWN)
         return schema
 
     def _validate_map_expr(self, expr: MapExpr):
@@ -328,91 +423,123 @@ class SemanticValidator:
             self._validate_scalar_expr(entry.value, entry.span.start)
 
     def _validate_scalar_expr(self, expr: Any, line: int, schema: Optional[Dict[str, Type]] = None) -> Type:
+        """Check names, scope and call arity across the tree, then infer the root's type.
+
+        The walk below only validates; it never types subtrees. infer_expr_type runs
+        once per (expr, schema), so each node is visited by one check pass and one
+        inference pass, never re-inferred per level.
+        """
         if not isinstance(expr, dict):
             return Type.UNKNOWN
-        etype = expr.get("type")
-        if etype == "col":
-            name = expr.get("name")
-            if not isinstance(name, str):
-                return Type.UNKNOWN
-            key = name.lower()
-            if key in self.kinds and self.kinds[key] == 'scalar':
-                self.used_scalars.add(key)
-            elif key in self.kinds and self.kinds[key] == 'table':
-                 raise SansScriptError(
-                    code="E_KIND_LOCK",
-                    message=f"Table '{name}' cannot be used as a scalar.",
-                    line=line
-                )
-            elif key in self.kinds and self.kinds[key] == 'datasource':
-                 raise SansScriptError(
-                    code="E_KIND_LOCK",
-                    message=f"Datasource '{name}' cannot be used as a scalar or column.",
-                    line=line
-                )
-            elif schema is not None:
-                if name not in schema:
-                    raise SansScriptError(
-                        code="E_UNKNOWN_COLUMN",
-                        message=f"Column '{name}' is not in scope.",
-                        line=line,
-                        hint=f"Available columns: {', '.join(schema.keys())}"
-                    )
-        elif etype == "binop":
-            self._validate_scalar_expr(expr.get("left"), line, schema)
-            self._validate_scalar_expr(expr.get("right"), line, schema)
-        elif etype == "boolop":
-            for arg in expr.get("args", []):
-                self._validate_scalar_expr(arg, line, schema)
-        elif etype == "unop":
-            self._validate_scalar_expr(expr.get("arg"), line, schema)
-        elif etype == "call":
-            name = expr.get("name")
-            args = expr.get("args", [])
-            if name == "if":
-                # Ternary if: requires all 3 args
-                if len(args) != 3:
-                    raise SansScriptError(
-                        code="E_BAD_EXPR",
-                        message=f"if() requires 3 arguments, got {len(args)}.",
-                        line=line
-                    )
-            # For map lookup m[key] desugared to put(key, map_name)
-            elif name == "put":
-                if len(args) != 2:
-                     raise SansScriptError(
-                        code="E_BAD_EXPR",
-                        message=f"map lookup (put) requires 2 arguments, got {len(args)}.",
-                        line=line
-                    )
-                map_arg = args[1] # This is the map name literal
-                if not (isinstance(map_arg, dict) and map_arg.get("type") == "lit" and isinstance(map_arg.get("value"), str)):
+        memo_key = (id(expr), id(schema))
+        memo_hit = self._expr_type_memo.get(memo_key)
+        if memo_hit is not None:
+            return memo_hit[1]
+        # Walk the tree with an explicit stack (children pushed right-to-left so
+        # nodes are checked in source order).
+        stack: List[Any] = [expr]
+        col_names: List[str] = []
+        # Hot attributes bound to locals for the walk.
+        kinds = self.kinds
+        used_scalars = self.used_scalars
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            etype = node.get("type")
+            if etype == "col":
+                name = node.get("name")
+                if not isinstance(name, str):
+                    continue
+                col_names.append(name)
+                key = sys.intern(name.lower())
+                kind = kinds.get(key)
+                if kind == 'scalar':
+                    used_scalars.add(key)
+                elif kind == 'table':
                      raise SansScriptError(
-                        code="E_BAD_EXPR",
-                        message=f"Map name in lookup (put) must be a literal string.",
+                        code="E_KIND_LOCK",
+                        message=f"Table '{name}' cannot be used as a scalar.",
                         line=line
                     )
-                map_name = map_arg["value"]
-                if map_name not in self.kinds or self.kinds[map_name] != "scalar" or map_name not in self.scalars:
+                elif kind == 'datasource':
                      raise SansScriptError(
-                        code="E_UNDEFINED_MAP",
-                        message=f"Map '{map_name}' is not defined as a scalar map.",
+                        code="E_KIND_LOCK",
+                        message=f"Datasource '{name}' cannot be used as a scalar or column.",
                         line=line
                     )
-                # Mark map as used
-                self.used_scalars.add(map_name)
+                elif schema is not None:
+                    if name not in schema:
+                        raise SansScriptError(
+                            code="E_UNKNOWN_COLUMN",
+                            message=f"Column '{name}' is not in scope.",
+                            line=line,
+                            hint=_available_columns_hint(schema)
+                        )
+            elif etype == "binop":
+                stack.append(node.get("right"))
+                stack.append(node.get("left"))
+            elif etype == "boolop":
+                stack.extend(reversed(node.get("args", [])))
+            elif etype == "unop":
+                stack.append(node.get("arg"))
+            elif etype == "call":
+                name = node.get("name")
+                args = node.get("args", [])
+                if name == "if":
+                    # Ternary if: requires all 3 args
+                    if len(args) != 3:
+                        raise SansScriptError(
+                            code="E_BAD_EXPR",
+                            message=f"if() requires 3 arguments, got {len(args)}.",
+                            line=line
+                        )
+                # For map lookup m[key] desugared to put(key, map_name)
+                elif name == "put":
+                    if len(args) != 2:
+                         raise SansScriptError(
+                            code="E_BAD_EXPR",
+                            message=f"map lookup (put) requires 2 arguments, got {len(args)}.",
+                            line=line
+                        )
+                    map_arg = args[1] # This is the map name literal
+                    if not (isinstance(map_arg, dict) and map_arg.get("type") == "lit" and isinstance(map_arg.get("value"), str)):
+                         raise SansScriptError(
+                            code="E_BAD_EXPR",
+                            message=f"Map name in lookup (put) must be a literal string.",
+                            line=line
+                        )
+                    map_name = map_arg["value"]
+                    # kinds[name] == 'scalar' is only ever set after scalars[name].
+                    if kinds.get(map_name) != "scalar":
+                         raise SansScriptError(
+                            code="E_UNDEFINED_MAP",
+                            message=f"Map '{map_name}' is not defined as a scalar map.",
+                            line=line
+                        )
+                    # Mark map as used
+                    used_scalars.add(map_name)
 
-            for arg in args:
-                self._validate_scalar_expr(arg, line, schema)
-        env: Dict[str, Type] = {}
-        if schema is not None:
-            env.update(schema)
-        env.update(self.scalar_types)
+                stack.extend(reversed(args))
+        # Inference only reads env for col refs (by name, then lower-cased name), so
+        # build it from the referenced names rather than copying the whole schema
+        # and scalar table; literal-only expressions get an empty env. One scratch
+        # dict is reused across calls; inference does not keep a reference to it.
+        env = self._env_scratch
+        env.clear()
+        scalar_types = self.scalar_types
+        for name in col_names:
+            for key in (name, name.lower()):
+                if key in scalar_types:
+                    env[key] = scalar_types[key]
+                elif schema is not None and key in schema:
+                    env[key] = schema[key]
         try:
-            return infer_expr_type(expr, env)
+            expr_type = infer_expr_type(expr, env)
         except TypeInferenceError as err:
             raise SansScriptError(code=err.code, message=err.message, line=line)
-        return Type.UNKNOWN
+        self._expr_type_memo[memo_key] = (schema, expr_type)
+        return expr_type
 
 def validate_script(script: SansScript, initial_tables: Set[str]) -> List[Dict[str, Any]]:
     validator = SemanticValidator(script, initial_tables)
@@ -6,7 +6,10 @@ Empty/whitespace tokens are treated as null and ignored for inference.
 from __future__ import annotations
 
 import csv
+import re
+from functools import lru_cache
 from io import StringIO
+from itertools import islice, zip_longest
 from pathlib import Path
 from typing import Any, List, Optional, Tuple
 
@@ -16,6 +19,10 @@ from decimal import Decimal, InvalidOperation
 DEFAULT_INFER_MAX_ROWS = 10_000
 INFERENCE_POLICY_VERSION = 1
 
+_BOOL_STRS = frozenset(("true", "false"))
+# Rows transposed per block in _infer_from_reader; bounds memory for large max_rows.
+_INFER_BLOCK_ROWS = 1024
+
 
 def _token_requires_string(s: str) -> bool:
     """True if token must be treated as string (e.g. leading zeros, non-numeric)."""
@@ -28,7 +35,7 @@ def _token_requires_string(s: str) -> bool:
     if t.startswith("-") and t[1:].isdigit() and len(t) > 2 and t[1] == "0":
         return True
     # Non-numeric (and not strict bool) => string
-    if t.lower() in ("true", "false"):
+    if t.lower() in _BOOL_STRS:
         return False
     try:
         int(t)
@@ -42,12 +49,38 @@ def _token_requires_string(s: str) -> bool:
         return True
 
 
+# Single-pass classifier for ASCII tokens without underscores. Branch order
+# mirrors _token_kind_exact: bool, leading-zero codes, int, then anything
+# Decimal() would accept (including inf/nan spellings).
+_DIGITS = r"[0-9]+"
+_TOKEN_KIND_RE = re.compile(
+    r"(?P<bool>(?i:true|false))"
+    r"|(?P<string>-?0[0-9]+)"
+    rf"|(?P<int>[+-]?{_DIGITS})"
+    rf"|(?P<decimal>[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][+-]?{_DIGITS})?"
+    rf"|(?i:inf(?:inity)?)|(?i:s?nan)(?:{_DIGITS})?))"
+)
+
+
 def _token_kind(s: str) -> str:
     """Return one of: 'null', 'string', 'decimal', 'int', 'bool'. Null tokens are ignored for inference."""
     t = s.strip()
     if not t:
         return "null"
-    if t.lower() in ("true", "false"):
+    if not t.isascii() or "_" in t:
+        # int()/Decimal() accept Unicode digits and digit-group underscores;
+        # defer to the exact path rather than encode those rules here.
+        return _token_kind_exact(t)
+    m = _TOKEN_KIND_RE.fullmatch(t)
+    return m.lastgroup if m is not None else "string"
+
+
+def _token_kind_exact(s: str) -> str:
+    """Reference classifier built on int()/Decimal(); used for tokens the regex does not cover."""
+    t = s.strip()
+    if not t:
+        return "null"
+    if t.lower() in _BOOL_STRS:
         return "bool"
     if _token_requires_string(s):
         return "string"
@@ -70,23 +103,29 @@ def _token_kind(s: str) -> str:
         return "string"
 
 
-def _infer_column_type(kinds: List[str]) -> str:
+# One bit per non-null token kind; a column's kinds fold into an int with |=.
+_BOOL, _INT, _DECIMAL, _STRING = 1, 2, 4, 8
+_KIND_BITS = {"null": 0, "bool": _BOOL, "int": _INT, "decimal": _DECIMAL, "string": _STRING}
+
+
+@lru_cache(maxsize=8192)
+def _token_kind_bits(s: str) -> int:
+    """Kind bit for a raw cell; cached because columns repeat codes and flags heavily."""
+    return _KIND_BITS[_token_kind(s)]
+
+
+def _mask_to_type(mask: int) -> str:
     """
     Monotonic rule: if any string => string; else if any decimal => decimal;
     else if any int => int; else if all non-null are bool => bool; else string.
     """
-    non_null = [k for k in kinds if k != "null"]
-    if not non_null:
-        return "string"
-    if "string" in non_null:
+    if not mask or mask & _STRING:
         return "string"
-    if "decimal" in non_null:
+    if mask & _DECIMAL:
         return "decimal"
-    if "int" in non_null:
+    if mask & _INT:
         return "int"
-    if all(k == "bool" for k in non_null):
-        return "bool"
-    return "string"
+    return "bool"
 
 
 def infer_csv_schema(
@@ -127,20 +166,43 @@ def _infer_from_reader(
         return [], 0, False
     # Column names in header order; normalize empty names to avoid duplicates
     column_names = [h.strip() if h.strip() else f"_col{i}" for i, h in enumerate(headers)]
-    # Per-column list of token kinds seen
+    # Per-column bitmask of token kinds seen
     num_cols = len(column_names)
-    column_kinds: List[List[str]] = [[] for _ in range(num_cols)]
+    column_masks = [0] * num_cols
+    # A string token settles a column's type, so only columns that have not
+    # seen one are classified. Rows are still counted for rows_scanned.
+    live = list(range(num_cols))
     rows_scanned = 0
-    truncated = False
-    for row in reader:
-        if rows_scanned >= max_rows:
-            truncated = True
+    # Module globals bound to locals for the per-column loop.
+    token_bits = _token_kind_bits
+    string_bit = _STRING
+    remaining = max_rows
+    while remaining > 0:
+        # Work column-wise on bounded row blocks: zip_longest transposes in C
+        # (padding short rows with the null token) and set() keeps one copy of
+        # each distinct cell, so repeated codes are classified once per block.
+        block = list(islice(reader, min(remaining, _INFER_BLOCK_ROWS)))
+        if not block:
             break
-        for i in range(num_cols):
-            token = row[i] if i < len(row) else ""
-            kind = _token_kind(token)
-            column_kinds[i].append(kind)
-        rows_scanned += 1
-    inferred_types = [_infer_column_type(kinds) for kinds in column_kinds]
+        rows_scanned += len(block)
+        remaining -= len(block)
+        if not live:
+            continue
+        columns = list(islice(zip_longest(*block, fillvalue=""), num_cols))
+        settled = False
+        for i in live:
+            if i >= len(columns):
+                break
+            mask = column_masks[i]
+            for token in set(columns[i]):
+                mask |= token_bits(token)
+                if mask & string_bit:
+                    settled = True
+                    break
+            column_masks[i] = mask
+        if settled:
+            live = [i for i in live if not column_masks[i] & string_bit]
+    truncated = next(reader, None) is not None
+    inferred_types = [_mask_to_type(mask) for mask in column_masks]
     columns = [{"name": name, "type": typ} for name, typ in zip(column_names, inferred_types)]
     return columns, rows_scanned, truncated
@@ -7,15 +7,23 @@ from __future__ import annotations
 import hashlib
 import json
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set
 
-from .types import Type, type_name
+from .schema_infer import INFERENCE_POLICY_VERSION, infer_csv_schema
+from .types import TYPE_NAME_MAP, Type, type_name
 
 SCHEMA_LOCK_VERSION = 1
 
+# json.dumps() builds a fresh encoder whenever non-default options are passed;
+# the canonical lock encoding reuses one.
+_LOCK_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
+
+@lru_cache(maxsize=1)
 def _git_sha() -> str:
+    # Spawns `git rev-parse HEAD`; run once per process rather than per lock build.
     try:
         out = subprocess.run(
             ["git", "rev-parse", "HEAD"],
@@ -48,7 +56,6 @@ def lock_entry_to_column_types(entry: Dict[str, Any]) -> Dict[str, Type]:
         name = col.get("name")
         typ = (col.get("type") or "unknown").strip().lower()
         if name is not None:
-            from .types import TYPE_NAME_MAP
             result[name] = TYPE_NAME_MAP.get(typ, Type.UNKNOWN)
     return result
 
@@ -85,32 +92,31 @@ def build_schema_lock(
     else if infer_untyped, from infer_csv_schema. Path: from irdoc.datasources[name].path, normalized to /.
     When infer_untyped and csv_path_overrides is set, CSV paths are taken from csv_path_overrides (e.g. from --inputs/--inputs-dir).
     """
-    from .ir import OpStep
-    from .schema_infer import (
-        INFERENCE_POLICY_VERSION,
-        infer_csv_schema,
-    )
-
     lock_entries = lock_by_name(schema_lock_used) if schema_lock_used else {}
     datasources_list: List[Dict[str, Any]] = []
+    datasources = irdoc.datasources or {}
 
     for name in sorted(referenced_names):
-        ds = irdoc.datasources.get(name) if irdoc.datasources else None
+        ds = datasources.get(name)
         if not ds:
             continue
-        if ds.kind not in ("csv", "inline_csv"):
+        # Declaration fields are read once into locals for the branches below.
+        kind = ds.kind
+        if kind not in ("csv", "inline_csv"):
             continue
-        path_str = (ds.path or "").replace("\\", "/") or f"{name}.csv"
+        ds_path = ds.path or ""
+        ds_columns = ds.columns
+        ds_column_types = ds.column_types
+        path_str = ds_path.replace("\\", "/") or f"{name}.csv"
         columns_order: List[str] = []
         column_types: Dict[str, str] = {}
         inference_meta: Dict[str, Any] = {}
 
-        if ds.column_types:
-            columns_order = list(ds.columns) if ds.columns else sorted(ds.column_types.keys())
-            column_types = {c: type_name(ds.column_types[c]) for c in columns_order if c in ds.column_types}
-            for c in columns_order:
-                if c not in column_types:
-                    column_types[c] = "unknown"
+        if ds_column_types:
+            columns_order = list(ds_columns) if ds_columns else sorted(ds_column_types)
+            # One pass over the declared types; the payload below only reads
+            # columns_order, and undeclared columns fall back to "unknown" there.
+            column_types = {c: type_name(t) for c, t in ds_column_types.items()}
         elif name in lock_entries:
             entry = lock_entries[name]
             columns_order = lock_entry_required_columns(entry)
@@ -121,8 +127,8 @@ def build_schema_lock(
                     column_types[n] = str(t).lower()
         else:
             if infer_untyped:
-                if ds.kind == "csv":
-                    raw_path = ds.path or f"{name}.csv"
+                if kind == "csv":
+                    raw_path = ds_path or f"{name}.csv"
                     if csv_path_overrides and name in csv_path_overrides:
                         resolved = csv_path_overrides[name]
                     else:
@@ -141,17 +147,19 @@ def build_schema_lock(
                     "rows_scanned": rows_scanned,
                     "truncated": truncated,
                 }
-            elif ds.columns:
-                columns_order = list(ds.columns)
-                column_types = {c: "unknown" for c in columns_order}
+            elif ds_columns:
+                columns_order = list(ds_columns)
 
         if not columns_order:
             continue
 
-        columns_payload = [{"name": c, "type": column_types.get(c, "unknown")} for c in columns_order]
+        # The payload is the lock's public in-memory shape (read back by
+        # lock_entry_* and enforcement), so it stays a list of name/type dicts.
+        get_type = column_types.get
+        columns_payload = [{"name": c, "type": get_type(c, "unknown")} for c in columns_order]
         entry_dict: Dict[str, Any] = {
             "columns": columns_payload,
-            "kind": ds.kind,
+            "kind": kind,
             "name": name,
             "path": path_str,
             "rules": {"extra_columns": "ignore", "missing_columns": "error"},
@@ -167,45 +175,60 @@ def build_schema_lock(
     }
 
 
+def _canonical_lock_entry(entry: Dict[str, Any]) -> str:
+    """One datasource entry as canonical JSON. Its keys are fixed, so they are
+    written in sorted order directly; only nested values go through the encoder."""
+    encode = _LOCK_ENCODER.encode
+    # Fixed defaults when absent: hashing deterministic; 0/0/false = not inferred, 1/N/bool = inferred
+    return (
+        f'{{"columns":{encode(entry.get("columns") or [])}'
+        f',"inference_policy_version":{encode(entry.get("inference_policy_version", 0))}'
+        f',"kind":{encode(entry.get("kind", "csv"))}'
+        f',"name":{encode(entry.get("name", ""))}'
+        f',"path":{encode(entry.get("path", ""))}'
+        f',"rows_scanned":{encode(entry.get("rows_scanned", 0))}'
+        f',"rules":{encode(entry.get("rules") or {})}'
+        f',"truncated":{encode(entry.get("truncated", False))}}}'
+    )
+
+
+def _canonical_lock_chunks(lock_dict: Dict[str, Any]) -> Iterator[str]:
+    """Canonical lock JSON in pieces: the top-level object written by hand in
+    sorted key order, one chunk per datasource entry."""
+    # Key order of nested dicts (created_by, rules, ...) is settled by the
+    # encoder's sort_keys; no need to pre-sort them here.
+    encode = _LOCK_ENCODER.encode
+    yield '{"created_by":'
+    yield encode(lock_dict.get("created_by") or {})
+    yield ',"datasources":['
+    for i, entry in enumerate(lock_dict.get("datasources") or []):
+        if i:
+            yield ","
+        yield _canonical_lock_entry(entry)
+    yield '],"schema_lock_version":'
+    yield encode(lock_dict.get("schema_lock_version", 1))
+    yield "}"
+
+
 def _canonical_lock_json(lock_dict: Dict[str, Any]) -> str:
     """Canonical JSON for hashing and for the written file. Sort top-level keys; datasources list order preserved.
     Inference fields use defaults (0, 0, false) when absent so hashing is deterministic; written JSON still
     distinguishes inferred (inference_policy_version=1, rows_scanned>0 or truncated) from pinned/lock (0, 0, false)."""
-    created_by = lock_dict.get("created_by") or {}
-    created_by = dict(sorted(created_by.items()))
-    datasources = lock_dict.get("datasources") or []
-    out_entries = []
-    for entry in datasources:
-        # Fixed defaults when absent: hashing deterministic; 0/0/false = not inferred, 1/N/bool = inferred
-        columns = entry.get("columns") or []
-        rules = entry.get("rules") or {}
-        rules = dict(sorted(rules.items()))
-        out_entries.append({
-            "columns": columns,
-            "inference_policy_version": entry.get("inference_policy_version", 0),
-            "kind": entry.get("kind", "csv"),
-            "name": entry.get("name", ""),
-            "path": entry.get("path", ""),
-            "rows_scanned": entry.get("rows_scanned", 0),
-            "rules": rules,
-            "truncated": entry.get("truncated", False),
-        })
-    payload = {
-        "created_by": created_by,
-        "datasources": out_entries,
-        "schema_lock_version": lock_dict.get("schema_lock_version", 1),
-    }
-    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return "".join(_canonical_lock_chunks(lock_dict))
 
 
 def compute_lock_sha256(lock_dict: Dict[str, Any]) -> str:
-    """SHA-256 of canonical lock JSON."""
-    canonical = _canonical_lock_json(lock_dict)
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    """SHA-256 of canonical lock JSON, fed chunk by chunk so the full document is never built."""
+    h = hashlib.sha256()
+    for chunk in _canonical_lock_chunks(lock_dict):
+        h.update(chunk.encode("utf-8"))
+    return h.hexdigest()
 
 
-def write_schema_lock(lock_dict: Dict[str, Any], path: Path) -> None:
-    """Write deterministic schema.lock.json. Sorted keys; datasources sorted by name; column order preserved."""
+def write_schema_lock(lock_dict: Dict[str, Any], path: Path) -> str:
+    """Write deterministic schema.lock.json. Sorted keys; datasources sorted by name; column order preserved.
+    Returns the SHA-256 of the written bytes (same as compute_lock_sha256(lock_dict))."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    canonical = _canonical_lock_json(lock_dict)
-    path.write_text(canonical, encoding="utf-8")
+    data = _canonical_lock_json(lock_dict).encode("utf-8")
+    path.write_bytes(data)
+    return hashlib.sha256(data).hexdigest()
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import csv
+import sys
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Optional
+from io import StringIO
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from .expr import ExprNode
 from .types import Type, from_literal, is_numeric, is_unknown, promote_numeric, type_name, unify
@@ -18,6 +21,11 @@ class TypeInferenceError(Exception):
 
 
 SchemaEnv = Dict[str, Type]
+# Inferred types keyed by (id(node), id(env)); see infer_expr_type.
+_ExprMemo = Dict[Tuple[int, int], Type]
+
+# Shared stand-in for env=None; inference only ever reads env.
+_EMPTY_ENV: SchemaEnv = {}
 
 
 def _type_error(op: str, left: Type | None, right: Type | None, detail: str, code: str = "E_TYPE") -> TypeInferenceError:
@@ -32,144 +40,193 @@ def _unknown_error(op: str, left: Type | None, right: Type | None, detail: str)
 
 
 def _require_bool(op: str, t: Type) -> Optional[TypeInferenceError]:
-    if t == Type.BOOL:
+    if t is Type.BOOL:
         return None
     if is_unknown(t):
         return _unknown_error(op, t, t, "operand must be bool")
     return _type_error(op, t, t, "operand must be bool")
 
 
-def infer_expr_type(expr: ExprNode, env: Optional[SchemaEnv] = None) -> Type:
+def infer_expr_type(
+    expr: ExprNode,
+    env: Optional[SchemaEnv] = None,
+    memo: Optional[_ExprMemo] = None,
+) -> Type:
+    """Infer the result type of expr against env (column/scalar name -> Type).
+
+    memo, when given, caches results by (id(node), id(env)). Callers must keep
+    every env used with it alive and unmodified for the memo's lifetime.
+    """
     if not isinstance(expr, dict):
         return Type.UNKNOWN
-    env = env or {}
-    node_type = expr.get("type")
-    if node_type == "lit":
-        return from_literal(expr.get("value"))
-    if node_type == "col":
-        name = expr.get("name", "")
-        if name in env:
-            return env[name]
-        lower = str(name).lower()
-        return env.get(lower, Type.UNKNOWN)
-    if node_type == "binop":
-        op = expr.get("op", "")
-        left_t = infer_expr_type(expr.get("left"), env)
-        right_t = infer_expr_type(expr.get("right"), env)
-        if op in {"+", "-", "*", "/"}:
-            if left_t == Type.NULL or right_t == Type.NULL:
-                raise _type_error(op, left_t, right_t, "null is not permitted in arithmetic")
-            if is_unknown(left_t) or is_unknown(right_t):
-                raise _unknown_error(op, left_t, right_t, "unknown is not permitted in arithmetic")
-            if not is_numeric(left_t) or not is_numeric(right_t):
-                raise _type_error(op, left_t, right_t, "arithmetic requires numeric operands")
-            if op == "/":
-                return Type.DECIMAL
-            return promote_numeric(left_t, right_t)
-        if op in {"==", "!="}:
-            if is_unknown(left_t) or is_unknown(right_t):
-                if (is_unknown(left_t) and is_unknown(right_t)) or (is_unknown(left_t) and right_t == Type.NULL) or (is_unknown(right_t) and left_t == Type.NULL):
-                    return Type.BOOL
-                raise _unknown_error(op, left_t, right_t, "unknown comparability")
-            if left_t == Type.NULL or right_t == Type.NULL:
-                return Type.BOOL
-            if left_t == right_t:
-                return Type.BOOL
-            if is_numeric(left_t) and is_numeric(right_t):
-                return Type.BOOL
-            raise _type_error(op, left_t, right_t, "operands must be comparable")
-        if op in {"<", "<=", ">", ">="}:
-            if left_t == Type.NULL or right_t == Type.NULL:
-                raise _type_error(op, left_t, right_t, "null is not permitted in ordered comparisons")
-            if is_unknown(left_t) or is_unknown(right_t):
-                raise _unknown_error(op, left_t, right_t, "unknown comparability")
-            if is_numeric(left_t) and is_numeric(right_t):
-                return Type.BOOL
-            if left_t == right_t == Type.STRING:
+    if env is None:
+        env = _EMPTY_ENV
+    if memo is None:
+        return _infer_node(expr, env, None)
+    key = (id(expr), id(env))
+    result = memo.get(key)
+    if result is None:
+        result = memo[key] = _infer_node(expr, env, memo)
+    return result
+
+
+def _infer_lit(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    return from_literal(expr.get("value"))
+
+
+def _infer_col(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    name = expr.get("name", "")
+    if name in env:
+        return env[name]
+    lower = str(name).lower()
+    return env.get(lower, Type.UNKNOWN)
+
+
+def _infer_binop(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    op = expr.get("op", "")
+    left_t = infer_expr_type(expr.get("left"), env, memo)
+    right_t = infer_expr_type(expr.get("right"), env, memo)
+    if op in {"+", "-", "*", "/"}:
+        if left_t == Type.NULL or right_t == Type.NULL:
+            raise _type_error(op, left_t, right_t, "null is not permitted in arithmetic")
+        if is_unknown(left_t) or is_unknown(right_t):
+            raise _unknown_error(op, left_t, right_t, "unknown is not permitted in arithmetic")
+        if not is_numeric(left_t) or not is_numeric(right_t):
+            raise _type_error(op, left_t, right_t, "arithmetic requires numeric operands")
+        if op == "/":
+            return Type.DECIMAL
+        return promote_numeric(left_t, right_t)
+    if op in {"==", "!="}:
+        if is_unknown(left_t) or is_unknown(right_t):
+            if (is_unknown(left_t) and is_unknown(right_t)) or (is_unknown(left_t) and right_t == Type.NULL) or (is_unknown(right_t) and left_t == Type.NULL):
                 return Type.BOOL
-            raise _type_error(op, left_t, right_t, "operands must be comparable")
-        raise _type_error(op, left_t, right_t, "unsupported operator")
-    if node_type == "boolop":
-        op = expr.get("op", "")
-        args = expr.get("args") or []
-        for arg in args:
-            t = infer_expr_type(arg, env)
-            err = _require_bool(op, t)
-            if err:
-                raise err
-        return Type.BOOL
-    if node_type == "unop":
-        op = expr.get("op", "")
-        arg_t = infer_expr_type(expr.get("arg"), env)
-        if op == "not":
-            err = _require_bool(op, arg_t)
-            if err:
-                raise err
+            raise _unknown_error(op, left_t, right_t, "unknown comparability")
+        if left_t == Type.NULL or right_t == Type.NULL:
             return Type.BOOL
-        if op in {"+", "-"}:
-            if arg_t == Type.NULL:
-                raise _type_error(op, arg_t, arg_t, "null is not permitted in arithmetic")
-            if is_unknown(arg_t):
-                raise _unknown_error(op, arg_t, arg_t, "unknown is not permitted in arithmetic")
-            if not is_numeric(arg_t):
-                raise _type_error(op, arg_t, arg_t, "arithmetic requires numeric operands")
-            return arg_t
-        raise TypeInferenceError(f"Type error for '{op}': unsupported unary operator")
-    if node_type == "call":
-        name = (expr.get("name") or "").lower()
-        args = expr.get("args") or []
-        if name == "if":
-            if len(args) != 3:
-                raise TypeInferenceError(f"Type error for 'if': expected 3 args, got {len(args)}")
-            cond_t = infer_expr_type(args[0], env)
-            err = _require_bool("if", cond_t)
-            if err:
-                raise err
-            then_t = infer_expr_type(args[1], env)
-            else_t = infer_expr_type(args[2], env)
-            try:
-                return unify(then_t, else_t, context="if")
-            except TypeError:
-                raise _type_error("if", then_t, else_t, "then/else types must unify")
-        if name == "coalesce":
-            if not args:
-                raise TypeInferenceError("Type error for 'coalesce': expected at least 1 arg")
-            result_t = None
-            for arg in args:
-                t = infer_expr_type(arg, env)
-                if is_unknown(t):
-                    return Type.UNKNOWN
-                if result_t is None:
-                    result_t = t
-                else:
-                    try:
-                        result_t = unify(result_t, t, context="if")
-                    except TypeError:
-                        raise _type_error("coalesce", result_t, t, "argument types must unify")
-            return result_t or Type.UNKNOWN
-        if name in {"put", "input"}:
-            return Type.UNKNOWN
+        if left_t == right_t:
+            return Type.BOOL
+        if is_numeric(left_t) and is_numeric(right_t):
+            return Type.BOOL
+        raise _type_error(op, left_t, right_t, "operands must be comparable")
+    if op in {"<", "<=", ">", ">="}:
+        if left_t == Type.NULL or right_t == Type.NULL:
+            raise _type_error(op, left_t, right_t, "null is not permitted in ordered comparisons")
+        if is_unknown(left_t) or is_unknown(right_t):
+            raise _unknown_error(op, left_t, right_t, "unknown comparability")
+        if is_numeric(left_t) and is_numeric(right_t):
+            return Type.BOOL
+        if left_t == right_t == Type.STRING:
+            return Type.BOOL
+        raise _type_error(op, left_t, right_t, "operands must be comparable")
+    raise _type_error(op, left_t, right_t, "unsupported operator")
+
+
+def _infer_boolop(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    op = expr.get("op", "")
+    args = expr.get("args") or []
+    # Stop at the first non-bool operand; the error is only built for it.
+    for arg in args:
+        t = infer_expr_type(arg, env, memo)
+        if t is not Type.BOOL:
+            raise _require_bool(op, t)
+    return Type.BOOL
+
+
+def _infer_unop(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    op = expr.get("op", "")
+    arg_t = infer_expr_type(expr.get("arg"), env, memo)
+    if op == "not":
+        err = _require_bool(op, arg_t)
+        if err:
+            raise err
+        return Type.BOOL
+    if op in {"+", "-"}:
+        if arg_t == Type.NULL:
+            raise _type_error(op, arg_t, arg_t, "null is not permitted in arithmetic")
+        if is_unknown(arg_t):
+            raise _unknown_error(op, arg_t, arg_t, "unknown is not permitted in arithmetic")
+        if not is_numeric(arg_t):
+            raise _type_error(op, arg_t, arg_t, "arithmetic requires numeric operands")
+        return arg_t
+    raise TypeInferenceError(f"Type error for '{op}': unsupported unary operator")
+
+
+def _infer_call(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    name = (expr.get("name") or "").lower()
+    args = expr.get("args") or []
+    if name == "if":
+        if len(args) != 3:
+            raise TypeInferenceError(f"Type error for 'if': expected 3 args, got {len(args)}")
+        cond_t = infer_expr_type(args[0], env, memo)
+        err = _require_bool("if", cond_t)
+        if err:
+            raise err
+        then_t = infer_expr_type(args[1], env, memo)
+        else_t = infer_expr_type(args[2], env, memo)
+        try:
+            return unify(then_t, else_t, context="if")
+        except TypeError:
+            raise _type_error("if", then_t, else_t, "then/else types must unify")
+    if name == "coalesce":
+        if not args:
+            raise TypeInferenceError("Type error for 'coalesce': expected at least 1 arg")
+        result_t = None
+        for arg in args:
+            t = infer_expr_type(arg, env, memo)
+            if is_unknown(t):
+                return Type.UNKNOWN
+            if result_t is None:
+                result_t = t
+            else:
+                try:
+                    result_t = unify(result_t, t, context="if")
+                except TypeError:
+                    raise _type_error("coalesce", result_t, t, "argument types must unify")
+        return result_t or Type.UNKNOWN
+    if name in {"put", "input"}:
         return Type.UNKNOWN
     return Type.UNKNOWN
 
 
+# One dict lookup per node instead of a chain of node-type comparisons.
+_INFER_DISPATCH = {
+    "lit": _infer_lit,
+    "col": _infer_col,
+    "binop": _infer_binop,
+    "boolop": _infer_boolop,
+    "unop": _infer_unop,
+    "call": _infer_call,
+}
+
+
+def _infer_node(expr: ExprNode, env: SchemaEnv, memo: Optional[_ExprMemo]) -> Type:
+    infer = _INFER_DISPATCH.get(expr.get("type"))
+    if infer is None:
+        return Type.UNKNOWN
+    return infer(expr, env, memo)
+
+
 def schema_to_strings(schema: Dict[str, Type]) -> Dict[str, str]:
     return {k: type_name(schema[k]) for k in sorted(schema)}
 
 
+def _intern_names(names: Iterable[Any]) -> list:
+    """Intern column names so schema dict lookups along the plan compare by identity."""
+    return [sys.intern(n) if type(n) is str else n for n in names]
+
+
 def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
-    from io import StringIO
-    import csv
-    from .ir import OpStep, is_ds_input, ds_name_from_input
+    # sans.ir imports this module at load time, so its names are resolved here.
+    from .ir import OpStep
 
     schema_map: Dict[str, Optional[Dict[str, Type]]] = {}
 
     for name, ds in (irdoc.datasources or {}).items():
-        cols = list(ds.columns) if ds.columns else None
+        cols = _intern_names(ds.columns) if ds.columns else None
         if not cols and ds.kind == "inline_csv" and ds.inline_text:
             reader = csv.reader(StringIO(ds.inline_text.strip()))
             try:
-                cols = next(reader)
+                cols = _intern_names(next(reader))
             except StopIteration:
                 cols = []
         if cols:
@@ -181,9 +238,16 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
     for table_name in irdoc.tables:
         schema_map.setdefault(table_name, None)
 
-    def _env_for(table_name: str) -> Dict[str, Type]:
-        schema = schema_map.get(table_name)
-        return dict(schema) if isinstance(schema, dict) else {}
+    # Schemas are never mutated once stored in schema_map: steps that keep the
+    # columns as-is share their input's dict, and steps that change them build a
+    # new one. Expression inference only reads its env.
+
+    # Predicate types by (node, schema). Parsed expressions are shared for
+    # identical text and schemas are shared along identity/sort/filter chains,
+    # so repeated filters hit. Envs used with the memo are pinned so their ids
+    # stay unique while it lives.
+    expr_memo: _ExprMemo = {}
+    memo_envs: Dict[int, SchemaEnv] = {}
 
     for step in irdoc.steps:
         if not isinstance(step, OpStep):
@@ -195,12 +259,14 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
         if op == "datasource":
             ds_name = step.params.get("name")
             ds_decl = irdoc.datasources.get(ds_name) if isinstance(ds_name, str) else None
-            cols = list(ds_decl.columns) if ds_decl and ds_decl.columns else (step.params.get("columns") or [])
+            cols = _intern_names(
+                ds_decl.columns if ds_decl and ds_decl.columns else (step.params.get("columns") or [])
+            )
             if not cols and step.params.get("kind") == "inline_csv":
                 inline_text = step.params.get("inline_text") or ""
                 reader = csv.reader(StringIO(inline_text.strip()))
                 try:
-                    cols = next(reader)
+                    cols = _intern_names(next(reader))
                 except StopIteration:
                     cols = []
             if cols and outputs:
@@ -215,18 +281,18 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
         input_schema = schema_map.get(inputs[0]) if inputs else None
 
         if op in {"identity", "sort"}:
-            out_schema = dict(input_schema) if isinstance(input_schema, dict) else None
+            out_schema = input_schema if isinstance(input_schema, dict) else None
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op == "filter":
             if isinstance(input_schema, dict):
-                env = _env_for(inputs[0]) if inputs else {}
                 pred = step.params.get("predicate")
                 if pred is not None:
+                    memo_envs[id(input_schema)] = input_schema
                     try:
-                        t = infer_expr_type(pred, env)
+                        t = infer_expr_type(pred, input_schema, expr_memo)
                     except TypeInferenceError as err:
                         raise TypeInferenceError(err.message, code=err.code, loc=step.loc)
                     if t != Type.BOOL:
@@ -236,8 +302,9 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
                             code=code,
                             loc=step.loc,
                         )
+            out_schema = input_schema if isinstance(input_schema, dict) else None
             for out in outputs:
-                schema_map[out] = dict(input_schema) if isinstance(input_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op == "assert":
@@ -263,19 +330,20 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
                 if cols:
                     out_schema = {c: input_schema.get(c, Type.UNKNOWN) for c in cols}
                 elif drop:
-                    out_schema = {c: t for c, t in input_schema.items() if c not in set(drop)}
+                    drop_set = frozenset(drop)
+                    out_schema = {c: t for c, t in input_schema.items() if c not in drop_set}
                 else:
-                    out_schema = dict(input_schema)
+                    out_schema = input_schema
             else:
                 out_schema = None
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op == "drop":
             cols = step.params.get("cols") or []
             if isinstance(input_schema, dict):
-                drop_set = set(cols)
+                drop_set = frozenset(cols)
                 for c in cols:
                     if c not in input_schema:
                         raise TypeInferenceError(
@@ -287,7 +355,7 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
             else:
                 out_schema = None
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op == "rename":
@@ -301,7 +369,7 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
             else:
                 out_schema = None
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op == "cast":
@@ -324,13 +392,14 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
                     else:
                         out_schema[col] = Type.UNKNOWN
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op == "compute":
             if isinstance(input_schema, dict):
+                # Fresh copy; it doubles as the env so later assignments see
+                # earlier targets.
                 out_schema = dict(input_schema)
-                env = dict(out_schema)
                 assignments = step.params.get("assignments")
                 if isinstance(assignments, list):
                     for assign in assignments:
@@ -339,15 +408,14 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
                         if not target or expr is None:
                             continue
                         try:
-                            t = infer_expr_type(expr, env)
+                            t = infer_expr_type(expr, out_schema)
                         except TypeInferenceError as err:
                             raise TypeInferenceError(err.message, code=err.code, loc=step.loc)
-                        out_schema[target] = t
-                        env[target] = t
+                        out_schema[sys.intern(target) if type(target) is str else target] = t
             else:
                 out_schema = None
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
             continue
 
         if op in {"aggregate", "summary"}:
@@ -365,22 +433,21 @@ def infer_table_schema_types(irdoc: Any) -> Dict[str, Dict[str, Type]]:
                 if name:
                     out_schema[name] = Type.UNKNOWN
             for out in outputs:
-                schema_map[out] = dict(out_schema) if out_schema else None
+                schema_map[out] = out_schema or None
             continue
 
         # Default: propagate if possible, else unknown
         if outputs:
-            if isinstance(input_schema, dict):
-                out_schema = dict(input_schema)
-            else:
-                out_schema = None
+            out_schema = input_schema if isinstance(input_schema, dict) else None
             for out in outputs:
-                schema_map[out] = dict(out_schema) if isinstance(out_schema, dict) else None
+                schema_map[out] = out_schema
 
     result: Dict[str, Dict[str, Type]] = {}
     for name, schema in schema_map.items():
         if name.startswith("__datasource__"):
             continue
         if isinstance(schema, dict):
-            result[name] = schema
+            # Steps share schema dicts internally; each table gets its own copy
+            # so callers can't change one table's schema through another.
+            result[name] = dict(schema)
     return result
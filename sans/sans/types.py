@@ -14,6 +14,12 @@ class Type(Enum):
     STRING = "string"
     UNKNOWN = "unknown"
 
+# Enum members are singletons, so the hot predicates below compare by identity
+# and set membership instead of going through Type attribute lookups each call.
+_NUMERIC_TYPES = frozenset((Type.INT, Type.DECIMAL))
+_UNKNOWN = Type.UNKNOWN
+_DECIMAL = Type.DECIMAL
+
 TYPE_NAME_MAP: dict[str, Type] = {
     "null": Type.NULL,
     "bool": Type.BOOL,
@@ -39,11 +45,11 @@ def parse_type_name(name: str) -> Type:
 
 
 def is_numeric(t: Type | None) -> bool:
-    return t in (Type.INT, Type.DECIMAL)
+    return t in _NUMERIC_TYPES
 
 
 def is_unknown(t: Type | None) -> bool:
-    return t is None or t == Type.UNKNOWN
+    return t is None or t is _UNKNOWN
 
 
 def from_literal(value: Any) -> Type:
@@ -66,8 +72,8 @@ def from_literal(value: Any) -> Type:
 
 
 def promote_numeric(left: Type, right: Type) -> Type:
-    if left == Type.DECIMAL or right == Type.DECIMAL:
-        return Type.DECIMAL
+    if left is _DECIMAL or right is _DECIMAL:
+        return _DECIMAL
     return Type.INT
 
 
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import csv
 import json
 import re
 
-from .runtime import _load_csv
+from .runtime import _parse_value
 
 
 ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# Bound once; the date check calls it per distinct cell text.
+_iso_date_match = ISO_DATE_RE.match
 
 
 @dataclass
@@ -43,24 +46,17 @@ def _add_issue(
     )
 
 
-def _required_columns(table: str) -> list[str]:
-    if table == "DM":
-        return ["DOMAIN", "USUBJID", "SUBJID", "SITEID", "SEX", "RACE"]
-    if table == "AE":
-        return ["DOMAIN", "USUBJID", "AEDECOD", "AESTDTC"]
-    if table == "LB":
-        return ["DOMAIN", "USUBJID", "LBTESTCD", "LBDTC", "LBSTRESN"]
-    return []
+_REQUIRED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "DM": ("DOMAIN", "USUBJID", "SUBJID", "SITEID", "SEX", "RACE"),
+    "AE": ("DOMAIN", "USUBJID", "AEDECOD", "AESTDTC"),
+    "LB": ("DOMAIN", "USUBJID", "LBTESTCD", "LBDTC", "LBSTRESN"),
+}
 
-
-def _date_columns(table: str, columns: list[str]) -> list[str]:
-    if table == "AE":
-        return ["AESTDTC"] if "AESTDTC" in columns else []
-    if table == "LB":
-        return ["LBDTC"] if "LBDTC" in columns else []
-    if table == "DM":
-        return ["RFSTDTC"] if "RFSTDTC" in columns else []
-    return []
+_DATE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "AE": ("AESTDTC",),
+    "LB": ("LBDTC",),
+    "DM": ("RFSTDTC",),
+}
 
 
 def validate_sdtm(bindings: Dict[str, str], out_dir: Path) -> Dict[str, Any]:
@@ -70,7 +66,7 @@ def validate_sdtm(bindings: Dict[str, str], out_dir: Path) -> Dict[str, Any]:
     for table_name, path_str in bindings.items():
         table_upper = table_name.upper()
         tables_seen.append(table_upper)
-        if table_upper not in {"DM", "AE", "LB"}:
+        if table_upper not in _REQUIRED_COLUMNS:
             continue
 
         path = Path(path_str)
@@ -83,10 +79,82 @@ def validate_sdtm(bindings: Dict[str, str], out_dir: Path) -> Dict[str, Any]:
             )
             continue
 
-        rows = _load_csv(path)
-        columns = list(rows[0].keys()) if rows else []
+        # One streaming pass per table: rows are read off the csv reader and
+        # dropped, so memory is bounded by the diagnostics rather than the file.
+        # Cells are indexed by header position and parsed exactly as _load_csv
+        # would (blank lines skipped, short rows padded with None, last duplicate
+        # header wins), but only when a check needs the value.
+        required = _REQUIRED_COLUMNS[table_upper]
+        with path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            headers = next(reader, None) or []
+            index = {col: i for i, col in enumerate(headers)}
+            domain_idx = index.get("DOMAIN")
+            usubjid_idx = index.get("USUBJID")
+            date_cols = [(c, index[c]) for c in _DATE_COLUMNS[table_upper] if c in index]
+            # Issues are buffered per check so the report stays grouped:
+            # missing columns, DOMAIN, USUBJID, then each date column.
+            domain_issues: List[ValidationIssue] = []
+            usubjid_issues: List[ValidationIssue] = []
+            date_issues: Dict[str, List[ValidationIssue]] = {c: [] for c, _ in date_cols}
+            # Date columns repeat heavily; remember texts that already matched.
+            valid_dates = set()
+            row_count = 0
+            for row in reader:
+                if not row:
+                    continue
+                row_count += 1
+                n = len(row)
+                if domain_idx is not None:
+                    raw = row[domain_idx] if domain_idx < n else None
+                    # Domain codes are non-numeric, so _parse_value returns them unchanged.
+                    if raw != table_upper:
+                        value = _parse_value(raw) if raw is not None else None
+                        if value != table_upper:
+                            _add_issue(
+                                domain_issues,
+                                code="SDTM_DOMAIN_VALUE_INVALID",
+                                message=f"DOMAIN value '{value}' does not match {table_upper}.",
+                                table=table_upper,
+                                column="DOMAIN",
+                                row=row_count,
+                                value=value,
+                            )
+                if usubjid_idx is not None:
+                    raw = row[usubjid_idx] if usubjid_idx < n else None
+                    if raw is None or raw.strip() == "":
+                        _add_issue(
+                            usubjid_issues,
+                            code="SDTM_USUBJID_MISSING",
+                            message="USUBJID is empty or missing.",
+                            table=table_upper,
+                            column="USUBJID",
+                            row=row_count,
+                            value=_parse_value(raw) if raw is not None else None,
+                        )
+                for col, i in date_cols:
+                    raw = row[i] if i < n else None
+                    if raw in valid_dates:
+                        continue
+                    # A raw text matching the pattern never parses as a number,
+                    # so testing it directly equals testing str() of the parsed value.
+                    if raw is not None and _iso_date_match(raw):
+                        valid_dates.add(raw)
+                        continue
+                    _add_issue(
+                        date_issues[col],
+                        code="SDTM_DATE_INVALID",
+                        message=f"{col} is not ISO8601 date (YYYY-MM-DD).",
+                        table=table_upper,
+                        column=col,
+                        row=row_count,
+                        value=_parse_value(raw) if raw is not None else None,
+                    )
 
-        for col in _required_columns(table_upper):
+        # Column presence comes from the first data row, as with _load_csv:
+        # a header-only file reports every required column as missing.
+        columns = frozenset(headers) if row_count else frozenset()
+        for col in required:
             if col not in columns:
                 _add_issue(
                     issues,
@@ -95,48 +163,10 @@ def validate_sdtm(bindings: Dict[str, str], out_dir: Path) -> Dict[str, Any]:
                     table=table_upper,
                     column=col,
                 )
-
-        if "DOMAIN" in columns:
-            for idx, row in enumerate(rows, start=1):
-                value = row.get("DOMAIN")
-                if value != table_upper:
-                    _add_issue(
-                        issues,
-                        code="SDTM_DOMAIN_VALUE_INVALID",
-                        message=f"DOMAIN value '{value}' does not match {table_upper}.",
-                        table=table_upper,
-                        column="DOMAIN",
-                        row=idx,
-                        value=value,
-                    )
-
-        if "USUBJID" in columns:
-            for idx, row in enumerate(rows, start=1):
-                value = row.get("USUBJID")
-                if value is None or (isinstance(value, str) and value.strip() == ""):
-                    _add_issue(
-                        issues,
-                        code="SDTM_USUBJID_MISSING",
-                        message="USUBJID is empty or missing.",
-                        table=table_upper,
-                        column="USUBJID",
-                        row=idx,
-                        value=value,
-                    )
-
-        for col in _date_columns(table_upper, columns):
-            for idx, row in enumerate(rows, start=1):
-                value = row.get(col)
-                if value is None or not ISO_DATE_RE.match(str(value)):
-                    _add_issue(
-                        issues,
-                        code="SDTM_DATE_INVALID",
-                        message=f"{col} is not ISO8601 date (YYYY-MM-DD).",
-                        table=table_upper,
-                        column=col,
-                        row=idx,
-                        value=value,
-                    )
+        issues.extend(domain_issues)
+        issues.extend(usubjid_issues)
+        for col_issues in date_issues.values():
+            issues.extend(col_issues)
 
     status = "ok" if not issues else "failed"
     report = {
@@ -1,6 +1,9 @@
 import struct
 import math
+import mmap
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
 from typing import List, Dict, Any, Optional, Union, Tuple
 from pathlib import Path
 from decimal import Decimal
@@ -28,21 +31,25 @@ class XptWarning:
 
 # --- IBM Float Conversion ---
 
-def _ibm_to_ieee(ibm_bytes: bytes) -> Optional[float]:
-    if len(ibm_bytes) != 8:
-        return None 
-    if ibm_bytes == b' ' * 8:
-        return None
-    if ibm_bytes == b'\x2E\x00\x00\x00\x00\x00\x00\x00':
+_IBM_BLANK = 0x2020202020202020  # b' ' * 8
+_IBM_MISSING = 0x2E00000000000000  # b'.' + b'\x00' * 7
+
+def _ibm_bits_to_ieee(int_val: int) -> Optional[float]:
+    """Convert an 8-byte IBM float, read as a big-endian unsigned int, to a float."""
+    if int_val == _IBM_BLANK or int_val == _IBM_MISSING:
         return None
-    int_val = struct.unpack(">Q", ibm_bytes)[0]
     if int_val == 0:
         return 0.0
-    sign = 1 if (ibm_bytes[0] & 0x80) else 0
-    exponent = (ibm_bytes[0] & 0x7F) - 64
-    mantissa_int = int_val & 0x00FFFFFFFFFFFFFF
-    mantissa = mantissa_int / 72057594037927936.0 # 2^56
-    return ((-1.0)**sign) * mantissa * (16.0 ** exponent)
+    # value = 0.mantissa (56 bits) * 16**(exp - 64). ldexp scales by the
+    # power of two exactly, so this rounds once, in the int -> float step.
+    exponent = ((int_val >> 56) & 0x7F) - 64
+    value = math.ldexp(int_val & 0x00FFFFFFFFFFFFFF, 4 * exponent - 56)
+    return -value if int_val >> 63 else value
+
+def _ibm_to_ieee(ibm_bytes: bytes) -> Optional[float]:
+    if len(ibm_bytes) != 8:
+        return None 
+    return _ibm_bits_to_ieee(struct.unpack(">Q", ibm_bytes)[0])
 
 def _ieee_to_ibm(val: Optional[Union[float, int, Decimal]]) -> bytes:
     if val is None:
@@ -60,18 +67,17 @@ def _ieee_to_ibm(val: Optional[Union[float, int, Decimal]]) -> bytes:
     if val < 0:
         sign = 1
         val = -val
-    try:
-        exponent = int(math.floor(math.log(val, 16))) + 1
-    except ValueError:
-        return b'\x00' * 8
-    mantissa = val / (16.0 ** exponent)
-    mant_int = int(mantissa * 72057594037927936.0) # 2^56
+    # val = m * 2**e with 0.5 <= m < 1, so the hex exponent is ceil(e / 4) and
+    # the fraction lands in [1/16, 1). Read off the binary exponent rather than
+    # rounding log(val, 16), which misplaces exact powers of 16.
+    m, e = math.frexp(val)
+    exponent = -(-e // 4)
     exp_field = exponent + 64
     if exp_field > 127 or exp_field < 0:
         return b'\x2E\x00\x00\x00\x00\x00\x00\x00'
+    mant_int = int(math.ldexp(m, 56 + e - 4 * exponent))
     first_byte = (sign << 7) | exp_field
-    packed_mant = struct.pack(">Q", mant_int)[1:]
-    return struct.pack("B", first_byte) + packed_mant
+    return ((first_byte << 56) | (mant_int & 0x00FFFFFFFFFFFFFF)).to_bytes(8, "big")
 
 # --- Helpers ---
 
@@ -83,9 +89,31 @@ def _read_str(b: bytes) -> str:
 
 class XptReader:
     def __init__(self, path: Path):
-        self.data = path.read_bytes()
+        # Map the file instead of reading it: header slices copy only the
+        # bytes they touch, and the OBS section is unpacked straight from the
+        # mapping, so transport files are paged in on demand.
+        self._file = path.open("rb")
+        try:
+            size = path.stat().st_size
+            self.data: Union[bytes, mmap.mmap] = (
+                mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+        except BaseException:
+            self._file.close()
+            raise
         self.pos = 0
         self.warnings: List[XptWarning] = []
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __enter__(self) -> "XptReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
         
     def warn(self, code: str, message: str) -> None:
         self.warnings.append(XptWarning(code=code, message=message))
@@ -171,32 +199,41 @@ class XptReader:
         # We process until end of data or next header? 
         # Standard XPT has no trailer for member data.
         
-        rows = []
-        cursor = 0
-        remaining = self.data[self.pos:]
-        if len(remaining) == 0:
+        start = self.pos
+        data_len = len(self.data) - start
+        if data_len <= 0:
             return []
-        remainder = len(remaining) % row_len
+        remainder = data_len % row_len
         if remainder:
-            trailing = remaining[-remainder:]
+            trailing = self.data[len(self.data) - remainder:]
             if trailing.strip(b" "):
                 raise XptError("SANS_RUNTIME_XPT_INVALID", "XPT data section length is invalid.")
-            remaining = remaining[:-remainder]
-        count = len(remaining) // row_len
-        
-        for _ in range(count):
-            row_bytes = remaining[cursor : cursor + row_len]
-            row = {}
-            row_cursor = 0
-            for var in variables:
-                val_bytes = row_bytes[row_cursor : row_cursor + var["length"]]
-                row_cursor += var["length"]
-                if var["type"] == "numeric":
-                    row[var["name"]] = _ibm_to_ieee(val_bytes)
-                else:
-                    row[var["name"]] = _read_str(val_bytes)
-            rows.append(row)
-            cursor += row_len
+        end = start + data_len - remainder
+
+        # Decode the OBS section column-wise: one struct unpacks every record in
+        # C (8-byte numerics as big-endian ints, everything else as raw bytes),
+        # the records are transposed, and each column is converted with map().
+        # Converters are memoized per read since columns repeat values heavily.
+        fmt = ">" + "".join(
+            "Q" if var["type"] == "numeric" and var["length"] == 8 else f'{var["length"]}s'
+            for var in variables
+        )
+        # The views are released before returning so the mapping can be closed.
+        with memoryview(self.data) as view, view[start:end] as section:
+            columns = list(zip(*struct.iter_unpack(fmt, section))) or [()] * len(variables)
+        to_float = lru_cache(maxsize=None)(_ibm_bits_to_ieee)
+        to_str = lru_cache(maxsize=None)(_read_str)
+        values = []
+        for var, column in zip(variables, columns):
+            if var["type"] != "numeric":
+                values.append(map(to_str, column))
+            elif var["length"] == 8:
+                values.append(map(to_float, column))
+            else:
+                # Truncated numerics are not decoded, as with _ibm_to_ieee.
+                values.append([None] * len(column))
+        names = [var["name"] for var in variables]
+        rows = [dict(zip(names, row_values)) for row_values in zip(*values)]
 
         def is_all_missing(r: Dict[str, Any]) -> bool:
             for var in variables:
@@ -220,7 +257,14 @@ class XptWriter:
         self.f = path.open("wb")
         
     def write_block(self, data: bytes):
-        self.f.write(data.ljust(BLOCK_SIZE, b' '))
+        if len(data) != BLOCK_SIZE:
+            data = data.ljust(BLOCK_SIZE, b' ')
+        self.f.write(data)
+
+    def write_blocks(self, data: bytes):
+        """Write a section padded with spaces to whole blocks."""
+        self.f.write(data)
+        self.f.write(b" " * ((BLOCK_SIZE - (len(data) % BLOCK_SIZE)) % BLOCK_SIZE))
         
     def write(self, rows: List[Dict[str, Any]], columns: List[str], dataset_name: str = "DATASET"):
         if not columns and rows:
@@ -277,7 +321,9 @@ class XptWriter:
         self.write_block(rec3)
         self.write_block(b"SAS     SAS     " + b" " * 64)
         
-        raw_namestrs = b""
+        # Sections are accumulated in bytearrays (amortized appends) rather
+        # than by bytes += bytes, which recopies the whole buffer per cell.
+        raw_namestrs = bytearray()
         for i, var in enumerate(vars_def):
             ntype = 1 if var["type"] == "numeric" else 2
             vdata = struct.pack(">H", ntype) + b"\x00\x00" + struct.pack(">H", var["length"]) + struct.pack(">H", i+1)
@@ -285,33 +331,28 @@ class XptWriter:
             vdata += _pad_str("", 40) + _pad_str("", 8) + struct.pack(">H", 0) + struct.pack(">H", 0) + _pad_str("", 8) + struct.pack(">H", 0) + struct.pack(">H", 0) + struct.pack(">l", 0)
             vdata += b" " * (140 - len(vdata))
             raw_namestrs += vdata
-        
-        pad_len = (BLOCK_SIZE - (len(raw_namestrs) % BLOCK_SIZE)) % BLOCK_SIZE
-        raw_namestrs += b" " * pad_len
-        for i in range(0, len(raw_namestrs), BLOCK_SIZE):
-            self.write_block(raw_namestrs[i:i+BLOCK_SIZE])
+        self.write_blocks(raw_namestrs)
             
         self.write_block(HEADER_RECORD_OBS)
         
-        raw_data = b""
-        for row in rows:
-            for var in vars_def:
-                if var["type"] == "numeric":
-                    raw_data += _ieee_to_ibm(row.get(var["name"]))
-                else:
-                    val = row.get(var["name"])
-                    text = "" if val is None else str(val)
-                    raw_data += _pad_str(text, var["length"])
-        
-        pad_len = (BLOCK_SIZE - (len(raw_data) % BLOCK_SIZE)) % BLOCK_SIZE
-        raw_data += b" " * pad_len
-        for i in range(0, len(raw_data), BLOCK_SIZE):
-            self.write_block(raw_data[i:i+BLOCK_SIZE])
+        # Observations are encoded column-wise: char columns pad each distinct
+        # text once (codes and flags repeat), then the column cells are
+        # interleaved back into records with a single join.
+        pad = lru_cache(maxsize=None)(_pad_str)
+        cells = []
+        for var in vars_def:
+            values = [row.get(var["name"]) for row in rows]
+            if var["type"] == "numeric":
+                cells.append(list(map(_ieee_to_ibm, values)))
+            else:
+                length = var["length"]
+                cells.append([pad("" if val is None else str(val), length) for val in values])
+        self.write_blocks(b"".join(chain.from_iterable(zip(*cells))))
         self.f.close()
 
 def load_xpt_with_warnings(path: Path) -> Tuple[List[Dict[str, Any]], List[XptWarning]]:
-    reader = XptReader(path)
-    rows = reader.read_dataset()
+    with XptReader(path) as reader:
+        rows = reader.read_dataset()
     return rows, reader.warnings
 
 
@@ -2,7 +2,10 @@ import json
 import logging
 from pathlib import Path
 
+import pytest
+
 from sans.runtime import run_script
+from sans.schema_infer import _token_kind, _token_kind_exact
 
 
 def _evidence(out_dir: Path) -> dict:
@@ -97,3 +100,15 @@ def test_vars_graph_uses_inferred_schema(tmp_path: Path, caplog) -> None:
     rename_step = next(s for s in plan["steps"] if s.get("op") == "rename")
     assert (f"v:{filter_step['inputs'][0]}.A", f"v:{filter_step['outputs'][0]}.A") in edges
     assert (f"v:{rename_step['inputs'][0]}.A", f"v:{rename_step['outputs'][0]}.A1") in edges
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "", "  ", "true", "FALSE", "0", "-0", "00", "-01", "+01", "12", "-7",
+        "1.5", ".5", "5.", "1e5", "-2E-3", "e5", "1.2.3", "inf", "-Infinity",
+        "NaN", "sNaN12", "1_000", "1_0.5", "_1", "\u0663", "x1", "0x10",
+    ],
+)
+def test_token_kind_matches_exact_classifier(token: str) -> None:
+    assert _token_kind(token) == _token_kind_exact(token)
@@ -1,6 +1,11 @@
 import pytest
 
-from sans.legacy import LegacyExprError, translate_legacy_predicate
+from sans.legacy import (
+    LegacyExprError,
+    find_legacy_tokens,
+    has_legacy_tokens,
+    translate_legacy_predicate,
+)
 
 
 def test_translate_legacy_predicate_basic():
@@ -26,3 +31,11 @@ def test_translate_legacy_predicate_errors():
     with pytest.raises(LegacyExprError) as exc_info:
         translate_legacy_predicate("a eq")
     assert exc_info.value.code == "E_LEGACY_EXPR"
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["a == 1", "a eq 1", "a = 1", "a ^= 1", "a ~= 1", "a <> 1", 'a == "x eq y"', "GE", "a != 1"],
+)
+def test_has_legacy_tokens_matches_find(text):
+    assert has_legacy_tokens(text) == bool(find_legacy_tokens(text))
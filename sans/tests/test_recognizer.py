@@ -216,3 +216,20 @@ def test_recognize_proc_transpose_block_missing_var():
 
     assert isinstance(step, UnknownBlockStep)
     assert step.code == "SANS_PARSE_TRANSPOSE_MISSING_VAR"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("if a > 1 then b = 2", ("a > 1", "b = 2")),
+        ("IF x THEN output", ("x", "output")),
+        ("if  a\tthen   do", ("a", "do")),
+        ("if thenx > 1 then y = 1", ("thenx > 1", "y = 1")),
+        ("if a then", None),
+        ("if a\n> 1 then b = 2", None),
+    ],
+)
+def test_split_if_then(text, expected):
+    from sans.recognizer import _split_if_then
+
+    assert _split_if_then(text) == expected
@@ -608,3 +608,162 @@ def test_cast_round_trip_byte():
     )
     expanded2 = irdoc_to_expanded_sans(irdoc2)
     assert expanded == expanded2, "cast round-trip should be byte-identical"
+
+
+def test_nested_do_block_in_pipeline_collected():
+    """A nested `derive do ... end` inside a pipeline block does not close the outer block."""
+    from sans.sans_script import parse_sans_script
+
+    script = (
+        "# sans 0.1\n"
+        "datasource in = inline_csv do\n"
+        "  a,b\n"
+        "  1,2\n"
+        "end\n"
+        "table t = from(in) do\n"
+        "  derive do\n"
+        "    c = a + 1\n"
+        "    d = b * 2\n"
+        "  end\n"
+        "  select a, c, d\n"
+        "end\n"
+    )
+    parsed = parse_sans_script(script, "nested.sans")
+    pipeline = parsed.statements[1].expr
+    assert [s.kind for s in pipeline.steps] == ["derive", "select"]
+    assert [a["target"] for a in pipeline.steps[0].params["assignments"]] == ["c", "d"]
+    assert pipeline.span.end == 12
+
+
+def test_multiline_paren_step_args_collected():
+    from sans.sans_script import parse_sans_script
+
+    script = (
+        "# sans 0.1\n"
+        "datasource in = inline_csv do\n"
+        "  a,b\n"
+        "  1,2\n"
+        "end\n"
+        "table t = from(in) do\n"
+        "  derive(c = coalesce(a,\n"
+        "    b),\n"
+        "    d = (a + 1))\n"
+        "  select a, c, d\n"
+        "end\n"
+    )
+    pipeline = parse_sans_script(script, "multiline.sans").statements[1].expr
+    assert [s.kind for s in pipeline.steps] == ["derive", "select"]
+    assert [a["target"] for a in pipeline.steps[0].params["assignments"]] == ["c", "d"]
+
+
+def test_line_lowered_view_matches_for_ascii_and_non_ascii_sources():
+    from sans.sans_script.parser import SansScriptParser
+
+    ascii_src = "# sans 0.1\nTABLE T = FROM(In) SELECT A  # Trailing Comment\n"
+    non_ascii_src = ascii_src + "# café\n"
+    ascii_parser = SansScriptParser(ascii_src)
+    non_ascii_parser = SansScriptParser(non_ascii_src)
+    ascii_lines = [ascii_parser._get_line(i) for i in range(2)]
+    non_ascii_lines = [non_ascii_parser._get_line(i) for i in range(3)]
+    assert ascii_lines[1].lowered == "table t = from(in) select a"
+    assert [l.lowered for l in ascii_lines] == [l.lowered for l in non_ascii_lines[:2]]
+
+
+def test_rename_chained_arrow_refused():
+    script = (
+        "# sans 0.1\n"
+        "datasource bar = inline_csv do\n"
+        "  a,b\n"
+        "  1,2\n"
+        "end\n"
+        "table foo = from(bar) rename(a -> b -> c)\n"
+    )
+    _assert_block_error(script, "E_PARSE")
+
+
+def test_trivial_expr_fast_path_matches_full_parser():
+    from sans.parser_expr import parse_expression_from_string
+    from sans.sans_script.parser import SansScriptParser
+
+    parser = SansScriptParser("")
+    parser._file_name = "fast.sans"
+    for text in ["active", " is_valid ", "Flag_1", "true", "AND", "42", "007"]:
+        assert parser._parse_expr(text, 1) == parse_expression_from_string(text, "fast.sans")
+
+
+def test_repeated_expr_reuses_cached_parse():
+    from sans.sans_script.parser import SansScriptParser
+
+    parser = SansScriptParser("")
+    parser._file_name = "cached.sans"
+    first = parser._parse_expr("a + 1", 1)
+    second = parser._parse_expr(" a + 1 ", 7)
+    assert second is first
+    # The cache belongs to one parser; another script gets its own nodes.
+    other = SansScriptParser("")
+    other._file_name = "cached.sans"
+    third = other._parse_expr("a + 1", 1)
+    assert third == first and third is not first
+    # Failures are not cached and still carry the caller's line.
+    for line_no in (3, 4):
+        try:
+            parser._parse_expr("a +", line_no)
+        except Exception as exc:
+            assert getattr(exc, "line", None) == line_no
+        else:
+            raise AssertionError("expected E_BAD_EXPR")
+
+
+def test_inline_csv_sha256_matches_normalized_text():
+    import hashlib
+
+    from sans.sans_script import parse_sans_script
+
+    script = (
+        "# sans 0.1\n"
+        "datasource in = inline_csv do\n"
+        "\n"
+        "  a,b   \n"
+        "  1,é\n"
+        "\n"
+        "end\n"
+    )
+    ds = parse_sans_script(script, "inline.sans").datasources["in"]
+    assert ds.inline_text == "  a,b\n  1,é\n"
+    assert ds.inline_sha256 == hashlib.sha256(ds.inline_text.encode("utf-8")).hexdigest()
+
+
+def test_identical_inline_csv_blocks_normalize_to_same_text():
+    from sans.sans_script import parse_sans_script
+
+    script = (
+        "# sans 0.1\n"
+        "datasource a = inline_csv do\n"
+        "  x,y\n"
+        "  1,2\n"
+        "end\n"
+        "datasource b = inline_csv do\n"
+        "  x,y   \n"
+        "  1,2\n"
+        "\n"
+        "end\n"
+    )
+    ds = parse_sans_script(script, "dedup.sans").datasources
+    assert ds["a"].inline_sha256 == ds["b"].inline_sha256
+    assert ds["a"].inline_text == ds["b"].inline_text
+
+
+def test_upper_case_keywords_keep_original_case_in_captured_groups():
+    from sans.sans_script import parse_sans_script
+
+    script = (
+        "# sans 0.1\n"
+        'DATASOURCE In = CSV("Data/Café.csv", COLUMNS(A, b))\n'
+        "TABLE T = from(in) SELECT A\n"
+        'SAVE t TO "Out/É.csv" AS "Nom"\n'
+    )
+    parsed = parse_sans_script(script, "case.sans")
+    ds = parsed.datasources["in"]
+    assert (ds.path, ds.columns) == ("Data/Café.csv", ["A", "b"])
+    save = parsed.statements[-1]
+    assert (save.table, save.path, save.name) == ("t", "Out/É.csv", "Nom")
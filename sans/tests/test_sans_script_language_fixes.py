@@ -153,3 +153,64 @@ def test_uppercase_headers_parse_and_execute(tmp_path: Path):
         rows = list(csv.reader(f))
     assert rows[0] == ["A1", "B"]
     assert rows[1:] == [["2", "20"]]
+
+
+def test_cast_does_not_change_source_table_schema():
+    from sans.sans_script import parse_sans_script
+    from sans.sans_script.validate import SemanticValidator
+    from sans.types import Type
+
+    script = (
+        "# sans 0.1\n"
+        'datasource ds = csv("x.csv", columns(x:string))\n'
+        "table a = from(ds) select x\n"
+        "table b = a cast(x -> int)\n"
+    )
+    validator = SemanticValidator(parse_sans_script(script, "cast.sans"), set())
+    validator.validate()
+    assert validator.table_schemas["a"] == {"x": Type.STRING}
+    assert validator.table_schemas["b"] == {"x": Type.INT}
+
+
+def test_repeated_expression_type_not_reused_after_update():
+    from sans.sans_script import parse_sans_script
+    from sans.sans_script.errors import SansScriptError
+    from sans.sans_script.validate import SemanticValidator
+
+    script = (
+        "# sans 0.1\n"
+        'datasource ds = csv("x.csv", columns(a:int))\n'
+        'table t = from(ds) derive(b = a + 1, update! a = "s", c = a + 1)\n'
+    )
+    parsed = parse_sans_script(script, "memo.sans")
+    assignments = parsed.statements[1].expr.transform.params["assignments"]
+    # Identical RHS text shares one parsed node.
+    assert assignments[0]["expr"] is assignments[2]["expr"]
+    validator = SemanticValidator(parsed, set())
+    try:
+        validator.validate()
+    except SansScriptError as exc:
+        assert exc.code == "E_TYPE"
+    else:
+        raise AssertionError("expected E_TYPE for string + int")
+
+
+def test_unknown_column_hint_lists_available_columns():
+    from sans.sans_script import parse_sans_script
+    from sans.sans_script.errors import SansScriptError
+    from sans.sans_script.validate import SemanticValidator
+
+    script = (
+        "# sans 0.1\n"
+        'datasource ds = csv("x.csv", columns(b:int, a:int))\n'
+        "table t = from(ds) drop z\n"
+    )
+    validator = SemanticValidator(parse_sans_script(script, "hint.sans"), set())
+    try:
+        validator.validate()
+    except SansScriptError as exc:
+        assert exc.code == "E_COLUMN_NOT_FOUND"
+        assert exc.hint == "Available columns: a, b"
+        assert "Hint: Available columns: a, b" in str(exc)
+    else:
+        raise AssertionError("expected E_COLUMN_NOT_FOUND")
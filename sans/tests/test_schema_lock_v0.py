@@ -1207,3 +1207,51 @@ def test_schema_lock_helpers():
     entry = by_name["ds"]
     req = lock_entry_required_columns(entry)
     assert req == ["a", "b"]
+
+
+def test_write_schema_lock_returns_sha_of_written_bytes(tmp_path: Path) -> None:
+    import hashlib
+
+    lock = {
+        "created_by": {"sans_version": "x", "git_sha": ""},
+        "datasources": [
+            {"name": "ds", "kind": "csv", "path": "ds.csv", "columns": [{"name": "a", "type": "int"}]},
+        ],
+        "schema_lock_version": 1,
+    }
+    path = tmp_path / "schema.lock.json"
+    sha = write_schema_lock(lock, path)
+    assert sha == compute_lock_sha256(lock)
+    assert sha == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_schema_lock_regeneration_rescans_changed_csv(tmp_path: Path) -> None:
+    import os
+
+    csv_path = tmp_path / "lb.csv"
+    csv_path.write_text("USUBJID,VISITNUM\nS001,1\n", encoding="utf-8")
+    script = (
+        "# sans 0.1\n"
+        f'datasource lb = csv("{csv_path.as_posix()}")\n'
+        "table t = from(lb) select USUBJID, VISITNUM\n"
+    )
+    script_path = tmp_path / "script.sans"
+    script_path.write_text(script, encoding="utf-8")
+    lock_path = tmp_path / "schema.lock.json"
+
+    def _lock_types() -> dict:
+        report = generate_schema_lock_standalone(
+            text=script, file_name=str(script_path), write_path=lock_path
+        )
+        assert report["status"] == "ok"
+        lock = json.loads(lock_path.read_text(encoding="utf-8"))
+        return {c["name"]: c["type"] for c in lock["datasources"][0]["columns"]}
+
+    assert _lock_types() == {"USUBJID": "string", "VISITNUM": "int"}
+    stat = csv_path.stat()
+    # Same size and mtime, new content (as cp -p or rsync -t leave it): the
+    # lock must reflect the content, not the file metadata.
+    csv_path.write_text("USUBJID,VISITNUM\nS001,x\n", encoding="utf-8")
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert csv_path.stat().st_size == stat.st_size
+    assert _lock_types() == {"USUBJID": "string", "VISITNUM": "string"}
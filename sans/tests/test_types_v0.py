@@ -42,3 +42,20 @@ def test_boolean_ops():
     assert infer_expr_type(boolop("and", [lit(True), lit(False)])) == Type.BOOL
     with pytest.raises(TypeInferenceError):
         infer_expr_type(boolop("and", [lit(1), lit(True)]))
+
+
+def test_table_schema_types_are_independent_per_table():
+    from sans.compiler import compile_sans_script
+    from sans.type_infer import infer_table_schema_types
+
+    script = (
+        "# sans 0.1\n"
+        'datasource ds = csv("x.csv", columns(a:int, b:string))\n'
+        "table t1 = from(ds) select a, b\n"
+        "table t2 = t1 filter(a > 1)\n"
+    )
+    irdoc = compile_sans_script(script, "alias.sans", tables=set())
+    schemas = infer_table_schema_types(irdoc)
+    assert schemas["t1"] == schemas["t2"] == {"a": Type.INT, "b": Type.STRING}
+    schemas["t2"]["c"] = Type.BOOL
+    assert "c" not in schemas["t1"]
@@ -171,3 +171,25 @@ def test_validate_sdtm_report_written_on_failure():
         assert report["summary"]["errors"] >= 1
     finally:
         shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_validate_sdtm_diagnostics_grouped_by_check(tmp_path: Path):
+    from sans.validator_sdtm import validate_sdtm
+
+    lb = tmp_path / "lb.csv"
+    _write_csv(
+        lb,
+        [
+            ["DOMAIN", "USUBJID", "LBTESTCD", "LBDTC", "LBSTRESN"],
+            ["XX", "", "GLUC", "bad", "95"],
+            ["YY", " ", "GLUC", "2023-01-02", "95"],
+        ],
+    )
+    report = validate_sdtm({"lb": str(lb)}, tmp_path / "out")
+    assert [(d["code"], d["row"]) for d in report["diagnostics"]] == [
+        ("SDTM_DOMAIN_VALUE_INVALID", 1),
+        ("SDTM_DOMAIN_VALUE_INVALID", 2),
+        ("SDTM_USUBJID_MISSING", 1),
+        ("SDTM_USUBJID_MISSING", 2),
+        ("SDTM_DATE_INVALID", 1),
+    ]
@@ -24,6 +24,17 @@ def test_ibm_float_conversion():
     vn = _ibm_to_ieee(bn)
     assert vn == -123.456
 
+def test_ibm_float_conversion_powers_of_16():
+    # Exact powers of 16 sit on the hex-exponent boundary; log(val, 16)
+    # lands just below the integer for some of them (e.g. 16**-29).
+    for exp in (-62, -29, -20, -1, 0, 1, 2, 20, 62):
+        val = 16.0 ** exp
+        assert _ibm_to_ieee(_ieee_to_ibm(val)) == val
+        assert _ibm_to_ieee(_ieee_to_ibm(-val)) == -val
+    # Magnitudes beyond IBM range encode as missing, up to the largest double.
+    assert _ibm_to_ieee(_ieee_to_ibm(1e300)) is None
+    assert _ibm_to_ieee(_ieee_to_ibm(1.5e308)) is None
+
 def test_xpt_metadata_and_missing(tmp_path):
     path = tmp_path / "test.xpt"
     rows = [